@@ -1,5 +1,7 @@
 import os
 
+import pytest
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 root_dir_content = os.listdir(BASE_DIR)
 PROJECT_DIR_NAME = 'yatube'
@@ -37,3 +39,13 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+
+@pytest.fixture(autouse=True, scope='session')
+def scratch_files(tmp_path_factory):
+    """Файлы метрик и версия подсказок тестов — во временном каталоге."""
+    from django.conf import settings
+
+    scratch = tmp_path_factory.mktemp('yatube')
+    settings.METRICS_DIR = str(scratch / 'metrics')
+    settings.AUTOCOMPLETE_VERSION_FILE = str(scratch / 'autocomplete.version')
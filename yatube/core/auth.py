@@ -0,0 +1,46 @@
+"""Пользователь из кеша вместо запроса к базе на каждой странице.
+
+Ключ включает хеш сессии и версию пользователя. Версия меняется при
+каждом сохранении пользователя, поэтому после смены пароля старые
+сессии проверяются по базе заново и разлогиниваются.
+"""
+import time
+
+from django.conf import settings
+from django.contrib import auth
+from django.core.cache import cache
+
+
+def user_version_key(user_id):
+    return f'auth:user-version:{user_id}'
+
+
+def get_user_version(user_id):
+    # Начальное значение от времени: если ключ вытеснен из кеша,
+    # записи со старыми версиями не подхватятся.
+    return cache.get_or_set(user_version_key(user_id), time.time_ns, None)
+
+
+def bump_user_version(user_id):
+    key = user_version_key(user_id)
+    cache.add(key, time.time_ns(), None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def get_user(request):
+    user_id = request.session.get(auth.SESSION_KEY)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if user_id is None or session_hash is None:
+        return auth.get_user(request)
+    key = 'auth:user:{}:{}:{}'.format(
+        user_id, get_user_version(user_id), session_hash,
+    )
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+    return user
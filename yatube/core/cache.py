@@ -0,0 +1,52 @@
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.memcached import MemcachedCache
+
+from core.metrics import CACHE_REQUESTS
+
+MISSING = object()
+
+# Эти кеши у каждого процесса свои: другие воркеры их изменений не видят.
+LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+def is_shared(alias=DEFAULT_CACHE_ALIAS):
+    return not isinstance(caches[alias], LOCAL_CACHES)
+
+
+def cache_area(key):
+    """Область ключа для метрик: префикс до двоеточия или key_prefix.
+
+    Ключи cache_page помечаются key_prefix страницы.
+    """
+    for marker in ('.cache_page.', '.cache_header.'):
+        if marker in key:
+            return key.split(marker, 1)[1].split('.', 1)[0] or 'page'
+    if key.startswith('core.sessions'):
+        return 'sessions'
+    area, found, _ = key.partition(':')
+    return area if found else 'other'
+
+
+class InstrumentedCacheMixin:
+    """Считает попадания и промахи get() по областям ключей."""
+
+    def get(self, key, default=None, version=None):
+        value = super().get(key, MISSING, version)
+        hit = value is not MISSING
+        # cache_page сначала читает заголовочный ключ, потом саму страницу:
+        # промах заголовка — промах страницы, а попадание учтётся страницей.
+        if not (hit and '.cache_header.' in key):
+            CACHE_REQUESTS.inc(
+                area=cache_area(key), result='hit' if hit else 'miss',
+            )
+        return value if hit else default
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
+
+
+class InstrumentedMemcachedCache(InstrumentedCacheMixin, MemcachedCache):
+    pass
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+from core.cache import is_shared
+
+
+@register(Tags.caches, deploy=True)
+def check_ratelimit_cache(app_configs, **kwargs):
+    """В бою счётчики лимитов должны быть общими для всех воркеров."""
+    if is_shared(settings.RATELIMIT_CACHE):
+        return []
+    return [Error(
+        f'RATELIMIT_CACHE ({settings.RATELIMIT_CACHE!r}) хранится внутри '
+        'процесса: у каждого воркера свои счётчики, и реальный лимит '
+        'умножается на число воркеров.',
+        hint='Задайте YATUBE_CACHE_LOCATION или укажите общий кеш.',
+        id='core.E001',
+    )]
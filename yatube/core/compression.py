@@ -0,0 +1,32 @@
+"""Сжатие ответов и статики: gzip всегда, brotli — если пакет установлен."""
+import gzip
+import re
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def gzip_compress(content, level=6):
+    # mtime=0 делает результат одинаковым при каждом сжатии.
+    return gzip.compress(content, compresslevel=level, mtime=0)
+
+
+def brotli_compress(content, level=5):
+    return brotli.compress(content, quality=level)
+
+
+# (кодировка, суффикс файла, функция) в порядке предпочтения.
+# Уровни по умолчанию рассчитаны на сжатие ответа на лету.
+COMPRESSORS = [('gzip', '.gz', gzip_compress)]
+if brotli is not None:
+    COMPRESSORS.insert(0, ('br', '.br', brotli_compress))
+
+# Статика сжимается один раз при collectstatic — берём наибольший уровень.
+STATIC_LEVELS = {'gzip': 9, 'br': 11}
+
+
+def accepts(request, encoding):
+    accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return re.search(rf'\b{encoding}\b', accept) is not None
@@ -0,0 +1,70 @@
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.http import Http404
+
+
+class IdentityMap:
+    """Объекты моделей, уже загруженные в рамках одного запроса.
+
+    Повторные обращения к тому же объекту не ходят в базу, а связанные
+    объекты для списка записей догружаются одним запросом на модель.
+    """
+
+    def __init__(self, user=None):
+        self.objects = defaultdict(dict)
+        self.user = user
+
+    def add(self, *objects):
+        for obj in objects:
+            self.objects[type(obj)][obj.pk] = obj
+
+    def prime_user(self, model):
+        # Пользователь запроса всё равно загружается для шапки сайта.
+        if self.user is not None and model is get_user_model():
+            if self.user.is_authenticated:
+                self.objects[model][self.user.pk] = self.user
+            self.user = None
+
+    def get_many(self, model, pks):
+        self.prime_user(model)
+        known = self.objects[model]
+        missing = {pk for pk in pks if pk is not None and pk not in known}
+        if missing:
+            known.update(model._default_manager.in_bulk(missing))
+        return {pk: known[pk] for pk in pks if pk in known}
+
+    def get(self, model, pk):
+        return self.get_many(model, [pk]).get(pk)
+
+    def get_or_404(self, model, pk):
+        obj = self.get(model, pk)
+        if obj is None:
+            raise Http404(f'{model._meta.object_name} {pk} не найден.')
+        return obj
+
+    def load_related(self, objects, *field_names):
+        """Подставляет объекты внешних ключей сразу для всего списка."""
+        for field_name in field_names:
+            by_model = defaultdict(list)
+            for obj in objects:
+                field = obj._meta.get_field(field_name)
+                by_model[field.related_model].append((obj, field))
+            for model, items in by_model.items():
+                related = self.get_many(
+                    model,
+                    {getattr(obj, field.attname) for obj, field in items},
+                )
+                for obj, field in items:
+                    pk = getattr(obj, field.attname)
+                    if pk is not None:
+                        setattr(obj, field_name, related[pk])
+
+
+def get_identity_map(request):
+    identity_map = getattr(request, 'identity_map', None)
+    if identity_map is None:
+        identity_map = request.identity_map = IdentityMap(
+            getattr(request, 'user', None),
+        )
+    return identity_map
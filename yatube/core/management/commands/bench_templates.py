@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from core.warmup import reset_templates, warm_templates
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает первый запрос к странице с пустым кешем шаблонов '
+        'и после прогрева.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/', help='Адрес страницы.')
+        parser.add_argument(
+            '--repeat', type=int, default=5, help='Число повторов.',
+        )
+
+    def first_request(self, url):
+        cache.clear()
+        started = time.perf_counter()
+        response = Client().get(url)
+        elapsed = time.perf_counter() - started
+        if response.status_code != 200:
+            self.stderr.write(f'{url}: {response.status_code}')
+        return elapsed * 1000
+
+    def handle(self, *args, **options):
+        url = options['url']
+        cold, warm, warmup = [], [], []
+        for _ in range(options['repeat']):
+            reset_templates()
+            cold.append(self.first_request(url))
+            reset_templates()
+            started = time.perf_counter()
+            count = warm_templates()
+            warmup.append((time.perf_counter() - started) * 1000)
+            warm.append(self.first_request(url))
+        self.stdout.write(
+            f'Холодный первый запрос: {statistics.median(cold):.1f} мс'
+        )
+        self.stdout.write(
+            f'Прогрев {count} шаблонов: {statistics.median(warmup):.1f} мс'
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Первый запрос после прогрева: {statistics.median(warm):.1f} мс'
+        ))
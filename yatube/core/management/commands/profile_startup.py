@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.startup import parse_importtime, run_boot
+
+
+class Command(BaseCommand):
+    help = (
+        'Запускает воркер в отдельном процессе и показывает, '
+        'сколько времени ушло на импорт каждого модуля.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--url', default='/about/author/',
+            help='Адрес первого запроса.',
+        )
+        parser.add_argument(
+            '--top', type=int, default=25,
+            help='Сколько самых медленных модулей показать.',
+        )
+
+    def handle(self, *args, **options):
+        result, output = run_boot(options['url'], importtime=True)
+        rows = parse_importtime(output)
+        rows.sort(key=lambda row: row[2], reverse=True)
+        self.stdout.write(f'{"своё, мс":>10} {"всего, мс":>10}  модуль')
+        for name, self_time, cumulative in rows[:options['top']]:
+            self.stdout.write(
+                f'{self_time / 1000:>10.1f} {cumulative / 1000:>10.1f}  {name}'
+            )
+        loaded = [
+            name for name in settings.STARTUP_LAZY_MODULES
+            if name in result['modules']
+        ]
+        if loaded:
+            self.stderr.write(
+                'Загружены при старте, хотя должны грузиться лениво: '
+                + ', '.join(loaded)
+            )
+        self.stdout.write(f'Модулей: {len(rows)}')
+        self.stdout.write(f'Запуск приложения: {result["boot"]:.3f} с')
+        style = (
+            self.style.SUCCESS
+            if result['first_request'] <= settings.STARTUP_BUDGET
+            else self.style.ERROR
+        )
+        self.stdout.write(style(
+            f'Первый ответ ({result["status"]}): '
+            f'{result["first_request"]:.3f} с '
+            f'при бюджете {settings.STARTUP_BUDGET:.1f} с'
+        ))
@@ -0,0 +1,45 @@
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.staticfiles import size_report
+
+
+def human(size):
+    if size is None:
+        return '-'
+    for unit in ('Б', 'КБ'):
+        if size < 1024:
+            return f'{size:.0f} {unit}'
+        size /= 1024
+    return f'{size:.1f} МБ'
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает размер собранной статики: исходный, gzip и brotli, '
+        'от самых тяжёлых файлов к лёгким.'
+    )
+
+    def handle(self, *args, **options):
+        if not hasattr(staticfiles_storage, 'hashed_files'):
+            raise CommandError('Хранилище статики не ведёт манифест.')
+        rows = size_report(staticfiles_storage)
+        if not rows:
+            raise CommandError(
+                'Манифест пуст: сначала запустите collectstatic.'
+            )
+        rows.sort(key=lambda row: row[1], reverse=True)
+        width = max(len(row[0]) for row in rows)
+        self.stdout.write(
+            f'{"Файл":<{width}}  {"размер":>10}  {"gzip":>10}  {"brotli":>10}'
+        )
+        for name, size, gzip_size, brotli_size in rows:
+            self.stdout.write(
+                f'{name:<{width}}  {human(size):>10}  '
+                f'{human(gzip_size):>10}  {human(brotli_size):>10}'
+            )
+        total = sum(row[1] for row in rows)
+        shipped = sum(row[2] or row[1] for row in rows)
+        self.stdout.write(self.style.SUCCESS(
+            f'Всего {human(total)}, с gzip {human(shipped)}'
+        ))
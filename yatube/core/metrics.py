@@ -0,0 +1,334 @@
+import glob
+import mmap
+import os
+import struct
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Заголовок файла: сколько байт занято записями (uint32) и выравнивание.
+HEADER = struct.Struct('I4x')
+KEY_LENGTH = struct.Struct('I')
+VALUE = struct.Struct('d')
+INITIAL_SIZE = 64 * 1024
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Имя метрики -> (тип, описание); заполняется объявлениями ниже.
+FAMILIES = {}
+
+
+def read_entries(data):
+    """(ключ, значение, смещение значения) из содержимого файла метрик."""
+    used = HEADER.unpack_from(data, 0)[0] if len(data) >= HEADER.size else 0
+    position = HEADER.size
+    while position < used:
+        length = KEY_LENGTH.unpack_from(data, position)[0]
+        key_start = position + KEY_LENGTH.size
+        key = data[key_start:key_start + length].decode()
+        # Ключ дополняется до границы 8 байт, чтобы значение было выровнено.
+        offset = key_start + length + (-(KEY_LENGTH.size + length) % 8)
+        yield key, VALUE.unpack_from(data, offset)[0], offset
+        position = offset + VALUE.size
+
+
+def process_start(pid):
+    """Время запуска процесса в тиках с загрузки системы или None.
+
+    Вместе с pid однозначно задаёт процесс: pid переиспользуются,
+    а время запуска у нового процесса другое. Доступно только в Linux.
+    """
+    try:
+        with open(f'/proc/{pid}/stat') as stat:
+            data = stat.read()
+    except OSError:
+        return None
+    # Имя процесса в скобках может содержать пробелы; starttime — 22-е
+    # поле, то есть 20-е после имени.
+    return int(data.rpartition(')')[2].split()[19])
+
+
+def store_name(pid):
+    return f'{pid}-{process_start(pid) or 0}.db'
+
+
+def is_alive(name):
+    """Жив ли процесс, которому принадлежит файл с таким именем."""
+    pid, _, start = name[:-len('.db')].partition('-')
+    try:
+        pid, start = int(pid), int(start or 0)
+    except ValueError:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return not start or process_start(pid) == start
+
+
+def mark_process_dead(pid, directory=None):
+    """Удаляет файлы завершившегося процесса.
+
+    Вызывается из хука ``child_exit`` gunicorn; без него файлы мёртвых
+    процессов убирает ``aggregate()`` при следующем чтении.
+    """
+    directory = str(directory or settings.METRICS_DIR)
+    for path in glob.glob(os.path.join(directory, f'{pid}-*.db')):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class MmapedDict:
+    """Счётчики одного процесса в файле, отображённом в память.
+
+    Писатель у файла один — процесс, которому он принадлежит, поэтому
+    межпроцессных блокировок нет: внутри процесса обновление защищает
+    обычный Lock, а читатели видят только записи до отметки в заголовке,
+    которая сдвигается после того, как запись заполнена.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.file = open(path, 'a+b')
+        if os.fstat(self.file.fileno()).st_size == 0:
+            self.file.truncate(INITIAL_SIZE)
+        self.map()
+        self.used = HEADER.unpack_from(self.mmap, 0)[0] or HEADER.size
+        self.positions = {
+            key: offset for key, _, offset in read_entries(self.mmap)
+        }
+
+    def map(self):
+        self.capacity = os.fstat(self.file.fileno()).st_size
+        self.mmap = mmap.mmap(self.file.fileno(), self.capacity)
+
+    def append(self, key):
+        encoded = key.encode()
+        padding = -(KEY_LENGTH.size + len(encoded)) % 8
+        entry = (
+            KEY_LENGTH.pack(len(encoded)) + encoded + b' ' * padding
+            + VALUE.pack(0.0)
+        )
+        while self.used + len(entry) > self.capacity:
+            self.mmap.close()
+            self.file.truncate(self.capacity * 2)
+            self.map()
+        self.mmap[self.used:self.used + len(entry)] = entry
+        self.positions[key] = self.used + len(entry) - VALUE.size
+        self.used += len(entry)
+        HEADER.pack_into(self.mmap, 0, self.used)
+
+    def inc(self, key, amount=1):
+        with self.lock:
+            if key not in self.positions:
+                self.append(key)
+            offset = self.positions[key]
+            value = VALUE.unpack_from(self.mmap, offset)[0]
+            VALUE.pack_into(self.mmap, offset, value + amount)
+
+    def close(self):
+        self.mmap.close()
+        self.file.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Файл метрик текущего процесса; после fork открывается свой."""
+    global _store
+    pid, directory = os.getpid(), str(settings.METRICS_DIR)
+    store = _store
+    if store is not None and (store.pid, store.directory) == (pid, directory):
+        return store
+    with _store_lock:
+        store = _store
+        if store is None or (store.pid, store.directory) != (pid, directory):
+            os.makedirs(directory, exist_ok=True)
+            _store = MmapedDict(os.path.join(directory, store_name(pid)))
+            _store.pid, _store.directory = pid, directory
+        return _store
+
+
+def escape(value):
+    return (
+        str(value).replace('\\', r'\\').replace('"', r'\"')
+        .replace('\n', r'\n')
+    )
+
+
+def sample_key(name, labels):
+    if not labels:
+        return name
+    pairs = ','.join(f'{label}="{escape(value)}"' for label, value in labels)
+    return f'{name}{{{pairs}}}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.labelnames = tuple(labelnames)
+        FAMILIES[name] = (self.kind, documentation)
+
+    def labels(self, values):
+        return [(label, values[label]) for label in self.labelnames]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        get_store().inc(sample_key(self.name, self.labels(labels)), amount)
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=None):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value, **labels):
+        store, labels = get_store(), self.labels(labels)
+        buckets = self.buckets or settings.METRICS_LATENCY_BUCKETS
+        # Корзины накопительные, как того требует формат; нули тоже
+        # пишутся, чтобы у каждой серии был полный набор корзин.
+        for bound in (*buckets, float('inf')):
+            store.inc(
+                sample_key(
+                    f'{self.name}_bucket',
+                    labels + [('le', format_value(float(bound)))],
+                ),
+                1 if value <= bound else 0,
+            )
+        store.inc(sample_key(f'{self.name}_sum', labels), value)
+        store.inc(sample_key(f'{self.name}_count', labels))
+
+
+class Gauge(Metric):
+    """Значение снимается в момент запроса /metrics сборщиками."""
+
+    kind = 'gauge'
+
+    def sample(self, value, **labels):
+        return sample_key(self.name, self.labels(labels)), value
+
+
+REQUESTS = Counter(
+    'yatube_http_requests_total', 'Обработанные HTTP-запросы.',
+    ('view', 'method', 'status'),
+)
+LATENCY = Histogram(
+    'yatube_http_request_duration_seconds', 'Время ответа на запрос.',
+    ('view',),
+)
+DB_QUERIES = Counter(
+    'yatube_db_queries_total', 'SQL-запросы, выполненные при ответе.',
+    ('view',),
+)
+CACHE_REQUESTS = Counter(
+    'yatube_cache_requests_total', 'Обращения к кешу на чтение.',
+    ('area', 'result'),
+)
+CACHE_HIT_RATIO = Gauge(
+    'yatube_cache_hit_ratio', 'Доля попаданий в кеш по областям ключей.',
+    ('area',),
+)
+
+
+def aggregate(directory=None):
+    """Сумма значений по файлам живых процессов.
+
+    Файлы завершившихся процессов удаляются: их счётчики пропадают,
+    и Prometheus видит это как обычный сброс счётчика.
+    """
+    directory = str(directory or settings.METRICS_DIR)
+    totals = {}
+    for path in glob.glob(os.path.join(directory, '*.db')):
+        if not is_alive(os.path.basename(path)):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            continue
+        try:
+            with open(path, 'rb') as metrics_file:
+                data = metrics_file.read()
+        except FileNotFoundError:
+            continue
+        for key, value, _ in read_entries(data):
+            totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def family_of(key):
+    name = key.partition('{')[0]
+    if name in FAMILIES:
+        return name
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in FAMILIES:
+            return name[:-len(suffix)]
+    return name
+
+
+def cache_hit_ratios(samples):
+    hits, totals = {}, {}
+    prefix = f'{CACHE_REQUESTS.name}{{area="'
+    for key, value in samples.items():
+        if not key.startswith(prefix):
+            continue
+        area = key[len(prefix):].partition('"')[0]
+        totals[area] = totals.get(area, 0) + value
+        if key.endswith('result="hit"}'):
+            hits[area] = hits.get(area, 0) + value
+    for area, total in totals.items():
+        yield CACHE_HIT_RATIO.sample(hits.get(area, 0) / total, area=area)
+
+
+def collect():
+    """Все значения: счётчики из файлов и снятые сейчас показатели."""
+    samples = aggregate()
+    samples.update(cache_hit_ratios(samples))
+    for path in settings.METRICS_COLLECTORS:
+        samples.update(import_string(path)())
+    return samples
+
+
+def sort_key(item):
+    """Корзины гистограммы идут по возрастанию границы, а не по тексту."""
+    base, found, bound = item[0].partition('le="')
+    if not found:
+        return item[0], 0.0
+    return base, float(bound.partition('"')[0])
+
+
+def render(samples=None):
+    """Текст в формате экспозиции Prometheus."""
+    if samples is None:
+        samples = collect()
+    grouped = {}
+    for key, value in samples.items():
+        grouped.setdefault(family_of(key), []).append((key, value))
+    lines = []
+    for name in sorted(grouped):
+        kind, documentation = FAMILIES.get(name, ('untyped', ''))
+        lines.append(f'# HELP {name} {documentation}')
+        lines.append(f'# TYPE {name} {kind}')
+        for key, value in sorted(grouped[name], key=sort_key):
+            lines.append(f'{key} {format_value(value)}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,216 @@
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+from django.utils.crypto import constant_time_compare
+from django.utils.decorators import decorator_from_middleware
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.functional import SimpleLazyObject
+from django.utils.text import compress_sequence
+
+from core.auth import get_user
+from core.cache import is_shared
+from core.compression import COMPRESSORS, accepts
+from core.loaders import IdentityMap
+from core.metrics import DB_QUERIES, LATENCY, REQUESTS
+from core.profiling import Profile, sampler, write_profile
+
+# Один проход по HTML: содержимое pre/textarea/script/style не трогаем,
+# комментарии (кроме условных) выкидываем, пробелы схлопываем.
+MINIFY_RE = re.compile(
+    r'(?P<keep><(?P<tag>pre|textarea|script|style)\b.*?</(?P=tag)\s*>)'
+    r'|(?P<comment><!--(?!\[if).*?-->)'
+    r'|(?P<space>\s{2,}|\n)',
+    re.IGNORECASE | re.DOTALL,
+)
+
+# Прочие методы пишутся в метрики как other: метод задаёт клиент,
+# и произвольные значения плодили бы ряды без предела.
+METRIC_METHODS = frozenset({
+    'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS',
+})
+
+
+def minify_match(match):
+    if match.group('keep'):
+        return match.group('keep')
+    if match.group('comment'):
+        return ''
+    return '\n' if '\n' in match.group('space') else ' '
+
+
+def minify_html(content):
+    return MINIFY_RE.sub(minify_match, content)
+
+
+class CachedAuthenticationMiddleware(AuthenticationMiddleware):
+    """Как AuthenticationMiddleware, но пользователь берётся из кеша.
+
+    Только при общем кеше: версию пользователя из кеша процесса другие
+    воркеры не увидят, и после смены пароля они продолжат пускать по
+    старой сессии.
+    """
+
+    def process_request(self, request):
+        super().process_request(request)
+        if not is_shared():
+            return
+        request.user = SimpleLazyObject(lambda: get_user(request))
+
+
+class IdentityMapMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request.identity_map = IdentityMap(getattr(request, 'user', None))
+        return self.get_response(request)
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unmatched'
+
+
+def method_label(request):
+    return request.method if request.method in METRIC_METHODS else 'other'
+
+
+class MetricsMiddleware:
+    """Считает запросы, время ответа и SQL-запросы по именам адресов."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = QueryCounter()
+        started = time.perf_counter()
+        with connection.execute_wrapper(queries):
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        view = view_label(request)
+        REQUESTS.inc(
+            view=view,
+            method=method_label(request),
+            status=response.status_code,
+        )
+        LATENCY.observe(elapsed, view=view)
+        if queries.count:
+            DB_QUERIES.inc(queries.count, view=view)
+        return response
+
+
+class ProfilerMiddleware:
+    """Профилирует медленные запросы к представлениям из PROFILE_VIEWS.
+
+    Стеки начинают сниматься, когда запрос превысил PROFILE_THRESHOLD,
+    или сразу, если заголовок X-Profile совпал с PROFILE_SECRET.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            profile = getattr(request, 'profile', None)
+            if profile is not None:
+                self.finish(profile, time.perf_counter() - started)
+
+    def forced(self, request):
+        secret = settings.PROFILE_SECRET
+        return bool(secret) and constant_time_compare(
+            request.META.get('HTTP_X_PROFILE', ''), secret,
+        )
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = request.resolver_match.view_name
+        if view not in settings.PROFILE_VIEWS:
+            return None
+        request.profile = Profile(view, forced=self.forced(request))
+        connection.execute_wrappers.append(request.profile.record_query)
+        sampler.start(request.profile)
+        return None
+
+    def finish(self, profile, elapsed):
+        sampler.stop(profile)
+        connection.execute_wrappers.remove(profile.record_query)
+        if profile.forced or elapsed >= settings.PROFILE_THRESHOLD:
+            write_profile(profile, elapsed)
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Минифицирует HTML и сжимает ответ по Accept-Encoding.
+
+    Ответ, у которого уже есть Content-Encoding, пропускается: так
+    страница, сжатая внутри cache_page, не сжимается второй раз.
+    Страницы с CSRF-токеном тоже не сжимаются: по размеру сжатого
+    ответа токен можно подобрать (BREACH).
+    """
+
+    def minify(self, response):
+        if response.get('Content-Type', '').startswith('text/html'):
+            response.content = minify_html(
+                response.content.decode(response.charset)
+            ).encode(response.charset)
+            response['Content-Length'] = str(len(response.content))
+
+    def choose(self, request, streaming):
+        for encoding, _, compressor in COMPRESSORS:
+            # Потоковый ответ умеем сжимать только через gzip.
+            if streaming and encoding != 'gzip':
+                continue
+            if accepts(request, encoding):
+                return encoding, compressor
+        return None, None
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '')
+        if not content_type.startswith(settings.COMPRESS_TYPES):
+            return response
+        if not response.streaming:
+            self.minify(response)
+            if len(response.content) < settings.COMPRESS_MIN_SIZE:
+                return response
+        if request.META.get('CSRF_COOKIE_USED'):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding, compressor = self.choose(request, response.streaming)
+        if encoding is None:
+            return response
+        if response.streaming:
+            response.streaming_content = compress_sequence(
+                response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            compressed = compressor(response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+
+# Для представлений под cache_page: в кеш попадает уже сжатое тело.
+compress_page = decorator_from_middleware(CompressionMiddleware)
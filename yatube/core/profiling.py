@@ -0,0 +1,160 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.utils import timezone
+
+
+def frame_label(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}.{getattr(code, "co_qualname", code.co_name)}'
+
+
+def fold(frame):
+    """Стек в формате flamegraph: от корня к листу через «;»."""
+    labels = []
+    while frame is not None:
+        labels.append(frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+
+class Profile:
+    """Сэмплы стека и SQL одного запроса."""
+
+    __slots__ = ('view', 'ident', 'started', 'forced', 'samples', 'queries')
+
+    def __init__(self, view, forced=False):
+        self.view = view
+        self.ident = threading.get_ident()
+        self.started = time.perf_counter()
+        self.forced = forced
+        self.samples = Counter()
+        self.queries = []
+
+    def due_at(self):
+        """Момент perf_counter(), с которого запрос пора сэмплировать."""
+        if self.forced:
+            return self.started
+        return self.started + settings.PROFILE_THRESHOLD
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(self.queries) < settings.PROFILE_MAX_QUERIES:
+                self.queries.append((time.perf_counter() - started, sql))
+
+
+class Sampler:
+    """Один фоновый поток на процесс снимает стеки медленных запросов.
+
+    Пока запросов нет, поток спит на условии; пока ни один не превысил
+    порог — спит до ближайшего момента превышения. Быстрые запросы
+    платят записью в словарь и пробуждением потока.
+    """
+
+    def __init__(self):
+        self.active = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.pid = None
+
+    def start(self, profile):
+        with self.condition:
+            # После fork потока-сэмплера в дочернем процессе нет.
+            if self.thread is None or self.pid != os.getpid():
+                self.pid = os.getpid()
+                self.thread = threading.Thread(
+                    target=self.run, name='profile-sampler', daemon=True,
+                )
+                self.thread.start()
+            self.active[profile.ident] = profile
+            self.condition.notify()
+
+    def stop(self, profile):
+        with self.condition:
+            self.active.pop(profile.ident, None)
+
+    def sample(self):
+        now = time.perf_counter()
+        with self.condition:
+            due = [
+                profile for profile in self.active.values()
+                if profile.due_at() <= now
+            ]
+        if not due:
+            return
+        frames = sys._current_frames()
+        for profile in due:
+            frame = frames.get(profile.ident)
+            if frame is not None:
+                profile.samples[fold(frame)] += 1
+
+    def wait(self):
+        """Ждёт, пока хотя бы один запрос не станет пора сэмплировать."""
+        with self.condition:
+            while True:
+                if not self.active:
+                    self.condition.wait()
+                    continue
+                delay = min(
+                    profile.due_at() for profile in self.active.values()
+                ) - time.perf_counter()
+                if delay <= 0:
+                    return
+                # Новый запрос разбудит раньше: у него может быть
+                # X-Profile и срок «сейчас».
+                self.condition.wait(delay)
+
+    def run(self):
+        while True:
+            self.wait()
+            self.sample()
+            time.sleep(settings.PROFILE_INTERVAL)
+
+
+sampler = Sampler()
+
+
+def prune(directory, keep):
+    """Оставляет keep последних профилей; имена начинаются со времени."""
+    stems = sorted({
+        name.rsplit('.', 1)[0] for name in os.listdir(directory)
+        if name.endswith(('.folded', '.sql'))
+    })
+    for stem in stems[:-keep] if keep else stems:
+        for suffix in ('.folded', '.sql'):
+            try:
+                os.remove(os.path.join(directory, stem + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def write_profile(profile, elapsed):
+    """Пишет стеки (.folded) и SQL (.sql) на диск, возвращает путь стеков.
+
+    .folded читают flamegraph.pl, speedscope и inferno.
+    """
+    directory = str(settings.PROFILE_DIR)
+    os.makedirs(directory, exist_ok=True)
+    stem = '{}_{}_{}ms_{}'.format(
+        timezone.now().strftime('%Y%m%dT%H%M%S.%f'),
+        profile.view.replace(':', '-'),
+        round(elapsed * 1000),
+        profile.ident,
+    )
+    path = os.path.join(directory, stem + '.folded')
+    with open(path, 'w') as folded:
+        for stack, count in profile.samples.most_common():
+            folded.write(f'{stack} {count}\n')
+    with open(os.path.join(directory, stem + '.sql'), 'w') as queries:
+        for duration, sql in profile.queries:
+            queries.write(f'-- {duration * 1000:.2f} ms\n{sql};\n')
+    prune(directory, settings.PROFILE_KEEP)
+    return path
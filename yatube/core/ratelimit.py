@@ -0,0 +1,91 @@
+import logging
+import time
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import caches
+from django.http import HttpResponse
+
+from core.cache import is_shared
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+logger = logging.getLogger(__name__)
+
+_warned = set()
+
+
+def parse_rate(rate):
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def get_client_key(request, key):
+    if key == 'user':
+        # Берём id из сессии, чтобы не загружать пользователя из базы.
+        user_id = request.session.get(SESSION_KEY)
+        if user_id is not None:
+            return f'user:{user_id}'
+    return 'ip:{}'.format(request.META.get('REMOTE_ADDR', ''))
+
+
+def warn_if_local(alias):
+    """Один раз на процесс: кеш процесса делает лимит на воркер."""
+    if alias not in _warned and not is_shared(alias):
+        _warned.add(alias)
+        logger.warning(
+            'RATELIMIT_CACHE %r хранится внутри процесса: у каждого воркера '
+            'свои счётчики, лимит умножается на число воркеров и '
+            'сбрасывается при перезапуске.', alias,
+        )
+
+
+def hit(scope, client, limit, window):
+    """Считает запрос в скользящем окне.
+
+    Окно приближается двумя соседними фиксированными окнами:
+    счётчик прошлого окна берётся с весом оставшейся доли времени.
+    Возвращает число секунд до повтора или 0, если лимит не превышен.
+    """
+    warn_if_local(settings.RATELIMIT_CACHE)
+    cache = caches[settings.RATELIMIT_CACHE]
+    now = time.time()
+    current = int(now // window)
+    key = f'ratelimit:{scope}:{client}:{current}'
+    cache.add(key, 0, window * 2)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Ключ успели вытеснить между add и incr.
+        cache.set(key, 1, window * 2)
+        count = 1
+    previous = cache.get(f'ratelimit:{scope}:{client}:{current - 1}', 0)
+    elapsed = now / window - current
+    if previous * (1 - elapsed) + count <= limit:
+        return 0
+    return int(window * (1 - elapsed)) + 1
+
+
+def ratelimit(scope, methods=('POST',)):
+    """Отвечает 429, если клиент превысил лимит из settings.RATELIMITS."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            config = settings.RATELIMITS.get(scope)
+            if config and request.method in methods:
+                limit, window = parse_rate(config['rate'])
+                client = get_client_key(request, config.get('key', 'user'))
+                retry_after = hit(scope, client, limit, window)
+                if retry_after:
+                    response = HttpResponse(
+                        'Слишком много запросов, попробуйте позже.',
+                        content_type='text/plain; charset=utf-8',
+                        status=HTTPStatus.TOO_MANY_REQUESTS,
+                    )
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,72 @@
+"""Сессии в кеше с отложенной записью в базу.
+
+Новая сессия и любой вход или выход сразу пишутся и в кеш, и в базу.
+Прочие изменения попадают только в кеш, а в базу — не чаще раза
+в SESSION_WRITE_BEHIND секунд, поэтому обычный запрос не пишет строку
+сессии.
+
+Отложенная запись включается только с общим для воркеров кешем: в кеше
+процесса изменения пропали бы при перезапуске, а другие воркеры читали
+бы устаревшую сессию. Без общего кеша хранилище работает как обычные
+сессии в базе: даже cached_db принимал бы в других воркерах ключ сессии,
+из которой уже вышли.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth import HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.cached_db import (
+    SessionStore as CachedDBStore,
+)
+from django.contrib.sessions.backends.db import SessionStore as DBStore
+
+from core.cache import is_shared
+
+# Когда и с каким пользователем сессия последний раз попала в базу.
+SAVED_KEY = '_db_saved'
+
+
+class SessionStore(CachedDBStore):
+    cache_key_prefix = 'core.sessions'
+
+    @property
+    def shared(self):
+        return is_shared(settings.SESSION_CACHE_ALIAS)
+
+    def load(self):
+        if not self.shared:
+            return DBStore.load(self)
+        return super().load()
+
+    def exists(self, session_key):
+        if not self.shared:
+            return DBStore.exists(self, session_key)
+        return super().exists(session_key)
+
+    def delete(self, session_key=None):
+        if not self.shared:
+            return DBStore.delete(self, session_key)
+        return super().delete(session_key)
+
+    def auth_state(self):
+        return [
+            self._session.get(SESSION_KEY),
+            self._session.get(HASH_SESSION_KEY),
+        ]
+
+    def needs_db_write(self):
+        saved_at, auth_state = self._session.get(SAVED_KEY, [0, None])
+        return (
+            time.time() - saved_at >= settings.SESSION_WRITE_BEHIND
+            or auth_state != self.auth_state()
+        )
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        if not self.shared:
+            return DBStore.save(self, must_create)
+        if must_create or self.needs_db_write():
+            self._session[SAVED_KEY] = [time.time(), self.auth_state()]
+            return super().save(must_create)
+        self._cache.set(self.cache_key, self._session, self.get_expiry_age())
@@ -0,0 +1,57 @@
+"""Замер холодного старта воркера в отдельном процессе."""
+import json
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Выполняется в чистом интерпретаторе: поднимает WSGI-приложение
+# и отдаёт один запрос, как это происходит у нового воркера.
+BOOT_SCRIPT = '''
+import json
+import sys
+import time
+from wsgiref.util import setup_testing_defaults
+
+started = time.perf_counter()
+from yatube.wsgi import application
+booted = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1]}
+setup_testing_defaults(environ)
+statuses = []
+b''.join(application(environ, lambda status, headers: statuses.append(status)))
+finished = time.perf_counter()
+print(json.dumps({
+    'boot': booted - started,
+    'first_request': finished - started,
+    'status': statuses[0],
+    'modules': sorted(sys.modules),
+}))
+'''
+
+
+def run_boot(url, importtime=False):
+    """Возвращает итоги запуска и вывод -X importtime (если просили)."""
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    # Счётчики воркера пишутся туда же, куда и у вызывающего процесса.
+    env = dict(os.environ, YATUBE_METRICS_DIR=str(settings.METRICS_DIR))
+    result = subprocess.run(
+        command + ['-c', BOOT_SCRIPT, url],
+        cwd=str(settings.BASE_DIR), env=env, capture_output=True, text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1]), result.stderr
+
+
+def parse_importtime(output):
+    """Разбирает вывод -X importtime: (модуль, своё время, общее), мкс."""
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, cumulative, name = line[len('import time:'):].split('|')
+        rows.append((name.strip(), int(self_time), int(cumulative)))
+    return rows
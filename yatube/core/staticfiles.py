@@ -0,0 +1,69 @@
+"""Хранилище статики с хешами в именах и заранее сжатыми копиями.
+
+При ``collectstatic`` рядом с каждым текстовым файлом кладутся ``.gz``
+и, если установлен пакет ``brotli``, ``.br``. Без манифеста (тесты,
+запуск без ``collectstatic``) шаблоны получают исходные имена файлов.
+"""
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from core.compression import COMPRESSORS, STATIC_LEVELS
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файла нет в STATIC_ROOT: collectstatic ещё не запускали.
+            return name
+
+    def is_hashed(self, name):
+        """Имя с хешем: такой файл никогда не меняется."""
+        if not hasattr(self, '_hashed_names'):
+            self._hashed_names = set(self.hashed_files.values())
+        return name in self._hashed_names
+
+    def compress(self, name):
+        if not name.endswith(settings.STATIC_COMPRESS_EXTENSIONS):
+            return
+        with self.open(name) as original:
+            content = original.read()
+        if len(content) < settings.STATIC_COMPRESS_MIN_SIZE:
+            return
+        for encoding, suffix, compressor in COMPRESSORS:
+            compressed = compressor(content, STATIC_LEVELS[encoding])
+            if len(compressed) >= len(content) * 0.95:
+                continue
+            if self.exists(name + suffix):
+                self.delete(name + suffix)
+            self._save(name + suffix, ContentFile(compressed))
+            yield name + suffix
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        self.__dict__.pop('_hashed_names', None)
+        if dry_run:
+            return
+        for name in sorted(set(self.hashed_files.values())):
+            for compressed_name in self.compress(name):
+                yield name, compressed_name, True
+
+
+def size_report(storage):
+    """Строки (имя, размер, gzip, brotli) по файлам из манифеста."""
+    rows = []
+    for name in sorted(set(storage.hashed_files.values())):
+        sizes = [storage.size(name)]
+        for suffix in ('.gz', '.br'):
+            path = storage.path(name + suffix)
+            sizes.append(
+                os.path.getsize(path) if os.path.exists(path) else None
+            )
+        rows.append((name, *sizes))
+    return rows
@@ -1,8 +1,13 @@
 from django import template
 
+from posts.paginator import page_window
+
 register = template.Library()
 
 
 @register.filter
 def addclass(field, css):
     return field.as_widget(attrs={'class': css})
+
+
+register.filter('page_window', page_window)
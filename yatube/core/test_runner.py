@@ -0,0 +1,30 @@
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+
+class TestRunner(DiscoverRunner):
+    """Кладёт файлы метрик и версию подсказок во временный каталог.
+
+    Иначе каждый прогон тестов оставлял бы свои файлы в общих
+    каталогах, которые читает работающий сервер.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.scratch = tempfile.mkdtemp(prefix='yatube-test-')
+        self.scratch_settings = override_settings(
+            METRICS_DIR=os.path.join(self.scratch, 'metrics'),
+            AUTOCOMPLETE_VERSION_FILE=os.path.join(
+                self.scratch, 'autocomplete.version',
+            ),
+        )
+        self.scratch_settings.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.scratch_settings.disable()
+        shutil.rmtree(self.scratch, ignore_errors=True)
+        super().teardown_test_environment(**kwargs)
@@ -0,0 +1,33 @@
+"""Общая подготовка тестов приложений: пустой кеш и временные каталоги."""
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.test import override_settings
+
+
+class IsolatedTestMixin:
+    """Каждый тест начинает с пустого кеша; каталоги и настройки,
+    выданные через make_dir() и override(), убираются после теста.
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+
+    def make_dir(self, **kwargs):
+        directory = tempfile.mkdtemp(**kwargs)
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        return directory
+
+    def override(self, **overrides):
+        overridden = override_settings(**overrides)
+        overridden.enable()
+        self.addCleanup(overridden.disable)
+
+    def share_cache(self):
+        """Файловый кеш вместо кеша процесса: общий, как memcached в бою."""
+        self.override(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': self.make_dir(),
+        }})
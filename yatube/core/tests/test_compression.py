@@ -0,0 +1,66 @@
+import gzip
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.middleware import minify_html
+from core.testing import IsolatedTestMixin
+from posts.models import Post, User
+
+
+class MinifyTests(TestCase):
+    def test_collapses_whitespace_outside_preformatted_blocks(self):
+        """Пробелы схлопываются везде, кроме pre и script."""
+        html = (
+            "<div>\n    <p>Текст   поста</p>\n\n</div><!-- служебное -->"
+            "<pre>  a\n  b</pre><script>var a =  1;\n</script>"
+        )
+        self.assertEqual(
+            minify_html(html),
+            "<div>\n<p>Текст поста</p>\n</div>"
+            "<pre>  a\n  b</pre><script>var a =  1;\n</script>",
+        )
+
+
+class CompressionTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        for number in range(10):
+            Post.objects.create(
+                author=cls.user, text=f"Тестовый пост {number}",
+            )
+
+    def test_index_is_cached_compressed(self):
+        """Главная кешируется сжатой; без gzip отдаётся как есть."""
+        response = self.client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", response["Vary"])
+        content = gzip.decompress(response.content).decode()
+        self.assertIn("Тестовый пост 9", content)
+        self.assertNotIn("  ", content.split("<script")[0])
+
+        with self.assertNumQueries(0):
+            cached = self.client.get("/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(cached.content, response.content)
+
+        plain = self.client.get("/")
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertContains(plain, "Тестовый пост 9")
+
+    def test_streaming_feed_is_gzipped(self):
+        """Потоковая лента сжимается gzip, даже если клиент принимает br."""
+        response = self.client.get(
+            "/feed/rss/", HTTP_ACCEPT_ENCODING="br, gzip",
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        content = gzip.decompress(b"".join(response.streaming_content))
+        self.assertIn("Тестовый пост 9", content.decode())
+
+    def test_page_with_csrf_token_is_not_compressed(self):
+        """Страница с CSRF-токеном отдаётся без сжатия (BREACH)."""
+        response = self.client.get(
+            reverse("users:login"), HTTP_ACCEPT_ENCODING="gzip",
+        )
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertContains(response, "csrfmiddlewaretoken")
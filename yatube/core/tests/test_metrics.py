@@ -0,0 +1,157 @@
+import os
+import subprocess
+import sys
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core import metrics
+from core.cache import cache_area
+from core.testing import IsolatedTestMixin
+from posts.models import Post, User
+
+
+class MetricsTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        Post.objects.create(author=cls.user, text="Пост")
+
+    def setUp(self):
+        super().setUp()
+        self.directory = self.make_dir()
+        self.override(METRICS_DIR=self.directory)
+
+    def test_process_files_are_summed(self):
+        """Значения из файлов разных процессов складываются."""
+        first_path = f"{self.directory}/{os.getpid()}-0.db"
+        first = metrics.MmapedDict(first_path)
+        second = metrics.MmapedDict(f"{self.directory}/{os.getppid()}-0.db")
+        for number in range(5000):
+            first.inc(f"key_{number}")
+        first.inc("shared", 2)
+        second.inc("shared", 0.5)
+        first.close()
+        second.close()
+        reopened = metrics.MmapedDict(first_path)
+        reopened.inc("shared")
+        totals = metrics.aggregate()
+        self.assertEqual(totals["shared"], 3.5)
+        self.assertEqual(totals["key_4999"], 1)
+        self.assertEqual(len(totals), 5001)
+        reopened.close()
+
+    def test_dead_process_files_are_removed(self):
+        """Файлы завершившихся процессов и чужого запуска pid удаляются."""
+        child = subprocess.Popen([sys.executable, "-c", "pass"])
+        child.wait()
+        dead = f"{self.directory}/{child.pid}-0.db"
+        reused = f"{self.directory}/{os.getpid()}-1.db"
+        for path in (dead, reused):
+            store = metrics.MmapedDict(path)
+            store.inc("stale")
+            store.close()
+        metrics.get_store().inc("live")
+        self.assertEqual(metrics.aggregate(), {"live": 1})
+        self.assertEqual(
+            os.listdir(self.directory),
+            [metrics.store_name(os.getpid())],
+        )
+
+    def test_mark_process_dead(self):
+        """Хук завершения воркера удаляет его файл."""
+        metrics.get_store().inc("live")
+        metrics.mark_process_dead(os.getpid())
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_metrics_are_closed_to_other_addresses(self):
+        """Чужим адресам /metrics открыт только с токеном."""
+        url = reverse("metrics")
+        self.assertEqual(
+            self.client.get(url, REMOTE_ADDR="10.0.0.1").status_code, 404,
+        )
+        with self.settings(METRICS_TOKEN="s3cret"):
+            response = self.client.get(
+                url, REMOTE_ADDR="10.0.0.1",
+                HTTP_AUTHORIZATION="Bearer s3cret",
+            )
+        self.assertEqual(response.status_code, 200)
+
+    def test_requests_latency_queries_and_cache(self):
+        """Запросы, время ответа, SQL и кеш попадают в /metrics."""
+        for _ in range(2):
+            self.client.get(reverse("posts:index"))
+        text = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn("# TYPE yatube_http_requests_total counter", text)
+        self.assertIn(
+            'yatube_http_requests_total{view="posts:index",method="GET",'
+            'status="200"} 2',
+            text,
+        )
+        self.assertIn(
+            'yatube_http_request_duration_seconds_count'
+            '{view="posts:index"} 2',
+            text,
+        )
+        self.assertIn('yatube_db_queries_total{view="posts:index"}', text)
+        self.assertIn(
+            'yatube_cache_requests_total{area="index_page",result="miss"} 1',
+            text,
+        )
+        self.assertIn('yatube_cache_hit_ratio{area="index_page"} 0.5', text)
+        buckets = [
+            line for line in text.splitlines()
+            if line.startswith("yatube_http_request_duration_seconds_bucket")
+        ]
+        bounds = [
+            float(line.split('le="')[1].split('"')[0]) for line in buckets
+        ]
+        self.assertEqual(bounds, sorted(bounds))
+        self.assertEqual(
+            len(bounds), len(settings.METRICS_LATENCY_BUCKETS) + 1,
+        )
+        self.assertTrue(buckets[-1].endswith('le="+Inf"} 2'))
+
+    def test_unknown_methods_share_label(self):
+        """Необычные методы считаются под одной меткой other."""
+        for method in ("PROPFIND", "BREW"):
+            self.client.generic(method, reverse("posts:index"))
+        text = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('method="other",status="200"} 2', text)
+        self.assertNotIn("PROPFIND", text)
+
+    def test_scheduled_queue_gauges(self):
+        """Очередь отложенных постов снимается в момент запроса."""
+        now = timezone.now()
+        Post.objects.create(
+            author=self.user, text="Опаздывает", is_published=False,
+            published_at=now - timedelta(minutes=2),
+        )
+        Post.objects.create(
+            author=self.user, text="Ждёт", is_published=False,
+            published_at=now + timedelta(hours=1),
+        )
+        samples = metrics.collect()
+        self.assertEqual(samples['yatube_scheduled_posts{state="due"}'], 1)
+        self.assertEqual(
+            samples['yatube_scheduled_posts{state="waiting"}'], 1,
+        )
+        self.assertGreaterEqual(
+            samples["yatube_scheduled_posts_lag_seconds"], 120,
+        )
+
+    def test_cache_areas(self):
+        """Область ключа кеша берётся из его префикса."""
+        self.assertEqual(cache_area("group:slug"), "group")
+        self.assertEqual(
+            cache_area("views.decorators.cache.cache_page.index_page.GET.1"),
+            "index_page",
+        )
+        self.assertEqual(
+            cache_area("views.decorators.cache.cache_header.index_page.1"),
+            "index_page",
+        )
+        self.assertEqual(cache_area("core.sessionsabc"), "sessions")
@@ -0,0 +1,87 @@
+import os
+import time
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core.profiling import Profile, sampler
+from core.testing import IsolatedTestMixin
+from posts.models import Post, User
+
+
+def busy_loop(seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+class ProfilerTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        cls.post = Post.objects.create(author=cls.user, text="Пост")
+
+    def setUp(self):
+        super().setUp()
+        self.directory = self.make_dir()
+        self.override(
+            PROFILE_DIR=self.directory,
+            PROFILE_THRESHOLD=60,
+            PROFILE_SECRET="s3cret",
+            PROFILE_INTERVAL=0.001,
+        )
+        self.url = reverse("posts:post_detail", args=[self.post.pk])
+
+    def profiles(self, suffix=".folded"):
+        return sorted(
+            name for name in os.listdir(self.directory)
+            if name.endswith(suffix)
+        )
+
+    def test_sampler_folds_stacks_of_due_requests(self):
+        """Сэмплер снимает стеки запроса в формате flamegraph."""
+        profile = Profile("test", forced=True)
+        sampler.start(profile)
+        busy_loop(0.1)
+        sampler.stop(profile)
+        self.assertTrue(profile.samples)
+        stack = profile.samples.most_common(1)[0][0]
+        self.assertTrue(stack.endswith(f"{__name__}.busy_loop"))
+
+    def test_fast_requests_leave_no_profile(self):
+        """Быстрые запросы и неверный X-Profile профилей не оставляют."""
+        self.client.get(self.url)
+        self.client.get(self.url, HTTP_X_PROFILE="wrong")
+        self.assertEqual(self.profiles(), [])
+
+    def test_secret_header_forces_profile_with_sql(self):
+        """Верный X-Profile пишет стеки и SQL-запросы."""
+        self.client.get(self.url, HTTP_X_PROFILE="s3cret")
+        self.client.get(reverse("posts:index"), HTTP_X_PROFILE="s3cret")
+        [folded] = self.profiles()
+        self.assertIn("posts-post_detail", folded)
+        [sql] = self.profiles(".sql")
+        with open(os.path.join(self.directory, sql)) as queries:
+            self.assertIn("posts_post", queries.read())
+
+    def test_threshold_triggers_and_retention_is_bounded(self):
+        """Медленный запрос профилируется, старые профили удаляются."""
+        with self.settings(PROFILE_THRESHOLD=0, PROFILE_KEEP=2):
+            for _ in range(3):
+                self.client.get(self.url)
+        self.assertEqual(len(self.profiles()), 2)
+        self.assertEqual(len(self.profiles(".sql")), 2)
+
+    def test_idle_sampler_sleeps_until_threshold(self):
+        """Без запросов и до порога поток не снимает стеки."""
+        calls = []
+        with mock.patch.object(
+            type(sampler), "sample", lambda self: calls.append(1),
+        ):
+            profile = Profile("test")
+            profile.started = time.perf_counter() + 60
+            sampler.start(profile)
+            time.sleep(0.05)
+            sampler.stop(profile)
+        self.assertEqual(calls, [])
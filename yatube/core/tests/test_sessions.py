@@ -0,0 +1,90 @@
+from django.contrib.auth import SESSION_KEY
+from django.contrib.sessions.models import Session
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase
+
+from core.sessions import SessionStore
+from core.testing import IsolatedTestMixin
+from posts.models import User
+
+
+class CachedSessionTests(IsolatedTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        # Файловый кеш общий для процессов, как memcached в бою.
+        self.override(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": self.make_dir(),
+        }})
+        self.user = User.objects.create_user(username="author")
+        self.client.force_login(self.user)
+
+    def test_authenticated_page_needs_no_queries(self):
+        """Пользователь и сессия читаются из общего кеша без запросов."""
+        self.client.get("/about/author/")
+        with self.assertNumQueries(0):
+            response = self.client.get("/about/author/")
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_user_cache_is_invalidated_on_save(self):
+        """Сохранение пользователя сбрасывает его копию в кеше."""
+        self.client.get("/about/author/")
+        self.user.username = "renamed"
+        self.user.save()
+        response = self.client.get("/about/author/")
+        self.assertEqual(response.context["user"].username, "renamed")
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля завершает остальные сессии."""
+        self.client.get("/about/author/")
+        self.user.set_password("new-password-123")
+        self.user.save()
+        response = self.client.get("/about/author/")
+        self.assertFalse(response.context["user"].is_authenticated)
+
+    def test_changes_are_written_behind(self):
+        """Изменения сессии попадают в базу не сразу, а в кеш сразу."""
+        key = self.client.session.session_key
+        session = SessionStore(key)
+        session["theme"] = "dark"
+        session.save()
+        self.assertEqual(SessionStore(key)["theme"], "dark")
+        stored = Session.objects.get(session_key=key).get_decoded()
+        self.assertNotIn("theme", stored)
+
+
+class LocalCacheSessionTests(IsolatedTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(username="author")
+        self.client.force_login(self.user)
+
+    def test_process_cache_writes_through(self):
+        """С кешем процесса сессия сразу пишется в базу."""
+        key = self.client.session.session_key
+        session = SessionStore(key)
+        session["theme"] = "dark"
+        session.save()
+        stored = Session.objects.get(session_key=key).get_decoded()
+        self.assertEqual(stored["theme"], "dark")
+
+    def test_process_cache_loads_session_from_db(self):
+        """С кешем процесса и сессия, и пользователь читаются из базы."""
+        self.client.get("/about/author/")
+        with self.assertNumQueries(2):
+            response = self.client.get("/about/author/")
+        self.assertEqual(response.context["user"], self.user)
+
+    def test_logout_is_seen_by_other_workers(self):
+        """Вышедшую сессию другой воркер не принимает."""
+        key = self.client.session.session_key
+
+        def load(backend):
+            session = SessionStore(key)
+            session._cache = backend
+            return session.load()
+
+        second = LocMemCache("second-worker", {})
+        self.assertIn(SESSION_KEY, load(second))
+        self.client.logout()
+        self.assertEqual(load(second), {})
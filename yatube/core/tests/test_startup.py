@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.test import SimpleTestCase
+
+from core.startup import parse_importtime, run_boot
+
+
+class StartupTests(SimpleTestCase):
+    def test_first_request_within_budget(self):
+        """Воркер отвечает на первый запрос в пределах STARTUP_BUDGET."""
+        result, _ = run_boot("/about/author/")
+        self.assertEqual(result["status"], "200 OK")
+        self.assertLess(result["first_request"], settings.STARTUP_BUDGET)
+
+    def test_first_request_skips_lazy_modules(self):
+        """Первый запрос не импортирует ленивые модули."""
+        result, output = run_boot("/about/author/", importtime=True)
+        self.assertEqual(result["status"], "200 OK")
+        for name in settings.STARTUP_LAZY_MODULES:
+            self.assertNotIn(name, result["modules"])
+        modules = [name for name, _, _ in parse_importtime(output)]
+        self.assertIn("posts.views", modules)
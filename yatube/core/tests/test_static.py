@@ -0,0 +1,64 @@
+import gzip
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.testing import IsolatedTestMixin
+
+STYLE = "body { color: black; }\n" * 100
+
+
+class StaticPipelineTests(IsolatedTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        source = self.make_dir(dir=settings.BASE_DIR)
+        root = self.make_dir(dir=settings.BASE_DIR)
+        os.makedirs(os.path.join(source, "css"))
+        with open(os.path.join(source, "css", "site.css"), "w") as file:
+            file.write(STYLE)
+        self.override(STATICFILES_DIRS=[source], STATIC_ROOT=root)
+        self.root = root
+
+    def test_unknown_file_is_not_hashed_without_manifest(self):
+        """Без манифеста адрес файла остаётся без хеша."""
+        self.assertEqual(
+            staticfiles_storage.url("img/logo.png"), "/static/img/logo.png",
+        )
+
+    def test_collectstatic_hashes_and_compresses(self):
+        """collectstatic хеширует и сжимает файлы, сервер отдаёт сжатые."""
+        call_command("collectstatic", interactive=False, verbosity=0)
+        hashed = staticfiles_storage.stored_name("css/site.css")
+        self.assertNotEqual(hashed, "css/site.css")
+        with open(os.path.join(self.root, hashed + ".gz"), "rb") as file:
+            self.assertEqual(
+                file.read(),
+                gzip.compress(STYLE.encode(), compresslevel=9, mtime=0),
+            )
+
+        response = self.client.get(
+            f"/static/{hashed}", HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        response.close()
+
+        response = self.client.get("/static/css/site.css")
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertNotIn("immutable", response["Cache-Control"])
+        response.close()
+
+        stdout = StringIO()
+        call_command("static_report", stdout=stdout)
+        self.assertIn(hashed, stdout.getvalue())
+
+    def test_missing_file_is_404(self):
+        """Путь за пределы статики даёт 404."""
+        self.assertEqual(
+            self.client.get("/static/../settings.py").status_code, 404,
+        )
@@ -0,0 +1,27 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.template import engines
+from django.test import TestCase
+
+from core.warmup import reset_templates, warm_templates
+
+
+class TemplateWarmupTests(TestCase):
+    def setUp(self):
+        self.loader = engines["django"].engine.template_loaders[0]
+        reset_templates()
+        self.addCleanup(reset_templates)
+
+    def test_templates_are_cached_after_warmup(self):
+        """После прогрева шаблоны лежат в кеше загрузчика."""
+        self.assertNotIn("includes/post.html", self.loader.get_template_cache)
+        self.assertGreater(warm_templates(), 0)
+        for name in ("base.html", "includes/post.html", "posts/index.html"):
+            self.assertIn(name, self.loader.get_template_cache)
+
+    def test_benchmark_command(self):
+        """Команда замера сравнивает холодный и прогретый рендер."""
+        stdout = StringIO()
+        call_command("bench_templates", repeat=1, stdout=stdout)
+        self.assertIn("после прогрева", stdout.getvalue())
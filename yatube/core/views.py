@@ -1,4 +1,22 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseNotModified,
+)
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from core import metrics
+from core.compression import COMPRESSORS, accepts
 
 
 def page_not_found(request, exception):
@@ -7,3 +25,62 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def serve_static(request, path):
+    """Отдаёт собранную статику, выбирая заранее сжатую копию.
+
+    Файлы с хешем в имени кешируются клиентом на год.
+    """
+    try:
+        full_path = staticfiles_storage.path(path)
+    except SuspiciousFileOperation:
+        raise Http404('Файл не найден.')
+    if not os.path.isfile(full_path):
+        raise Http404('Файл не найден.')
+    stat = os.stat(full_path)
+    if not was_modified_since(
+        request.META.get('HTTP_IF_MODIFIED_SINCE'),
+        stat.st_mtime, stat.st_size,
+    ):
+        return HttpResponseNotModified()
+    content_type, _ = mimetypes.guess_type(full_path)
+    encoding = None
+    for name, suffix, _ in COMPRESSORS:
+        if accepts(request, name) and os.path.isfile(full_path + suffix):
+            encoding, full_path = name, full_path + suffix
+            break
+    response = FileResponse(
+        open(full_path, 'rb'),
+        content_type=content_type or 'application/octet-stream',
+    )
+    if encoding:
+        response['Content-Encoding'] = encoding
+    response['Vary'] = 'Accept-Encoding'
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    if staticfiles_storage.is_hashed(path):
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+        )
+    else:
+        response['Cache-Control'] = 'public, max-age=3600'
+    return response
+
+
+def metrics_allowed(request):
+    if request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    return bool(token) and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}',
+    )
+
+
+def metrics_view(request):
+    """Метрики для Prometheus: с разрешённых адресов или по токену.
+
+    Чужим отвечаем 404, чтобы не выдавать сам адрес.
+    """
+    if not metrics_allowed(request):
+        raise Http404('Страница не найдена.')
+    return HttpResponse(metrics.render(), content_type=metrics.CONTENT_TYPE)
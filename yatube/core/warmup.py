@@ -0,0 +1,43 @@
+"""Предварительная компиляция шаблонов проекта при старте воркера."""
+import os
+
+from django.conf import settings
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+
+
+def project_template_dirs():
+    engine = engines['django'].engine
+    project = str(settings.BASE_DIR)
+    # Шаблоны из django.contrib и сторонних пакетов не трогаем.
+    app_dirs = [
+        str(path) for path in get_app_template_dirs('templates')
+        if str(path).startswith(project)
+    ]
+    return [str(path) for path in engine.dirs] + app_dirs
+
+
+def project_template_names():
+    names = set()
+    for directory in project_template_dirs():
+        for root, _, files in os.walk(directory):
+            for file_name in files:
+                if file_name.endswith(('.html', '.txt', '.xml')):
+                    names.add(os.path.relpath(
+                        os.path.join(root, file_name), directory,
+                    ).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def reset_templates():
+    for loader in engines['django'].engine.template_loaders:
+        loader.reset()
+
+
+def warm_templates():
+    """Кладёт все шаблоны проекта в кеш загрузчика, возвращает их число."""
+    engine = engines['django'].engine
+    names = project_template_names()
+    for name in names:
+        engine.get_template(name)
+    return len(names)
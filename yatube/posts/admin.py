@@ -1,20 +1,97 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.utils import timezone
 
-from posts.models import Group, Post
+from posts.caching import bump_posts_version
+from posts.models import Group, Post, PostRevision
+from posts.paginator import CachedCountPaginator
+from posts.revisions import revision_text
+from posts.stats import refresh_group_stats
+
+
+class PostActionForm(ActionForm):
+    group_slug = forms.SlugField(
+        required=False,
+        label='Слаг группы',
+    )
 
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    list_display = (
+        'pk', 'text', 'pub_date', 'is_published', 'published_at', 'author',
+        'group',
+    )
     list_editable = ('group',)
+    list_select_related = ('author', 'group')
+    autocomplete_fields = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    list_filter = ('is_published', 'pub_date')
+    date_hierarchy = 'pub_date'
+    paginator = CachedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = ('move_to_group', 'clear_group')
     empty_value_display = '-пусто-'
 
+    def update_group(self, queryset, group):
+        """Меняет группу одним UPDATE и пересчитывает затронутые группы.
+
+        UPDATE не трогает auto_now, поэтому updated ставится явно:
+        по нему снимок находит изменённые посты.
+        """
+        group_ids = set(
+            queryset.order_by().values_list('group_id', flat=True).distinct()
+        )
+        updated = queryset.update(group=group, updated=timezone.now())
+        if group is not None:
+            group_ids.add(group.pk)
+        group_ids.discard(None)
+        refresh_group_stats(group_ids)
+        bump_posts_version()
+        return updated
+
+    def move_to_group(self, request, queryset):
+        slug = request.POST.get('group_slug')
+        group = Group.objects.filter(slug=slug).first() if slug else None
+        if group is None:
+            self.message_user(
+                request, 'Укажите слаг существующей группы.', messages.ERROR,
+            )
+            return
+        updated = self.update_group(queryset, group)
+        self.message_user(request, f'Перенесено постов: {updated}')
+    move_to_group.short_description = 'Перенести в группу'
+
+    def clear_group(self, request, queryset):
+        updated = self.update_group(queryset, None)
+        self.message_user(request, f'Убрано из групп постов: {updated}')
+    clear_group.short_description = 'Убрать из группы'
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
     list_display = ("pk", "title", "slug", "description")
-    search_fields = ("title",)
+    search_fields = ("title", "slug")
     list_filter = ("slug",)
     empty_value_display = "-пусто-"
+
+
+@admin.register(PostRevision)
+class PostRevisionAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'post', 'number', 'created', 'editor', 'is_snapshot')
+    list_select_related = ('post', 'editor')
+    list_filter = ('created',)
+    fields = ('post', 'number', 'created', 'editor', 'text')
+    readonly_fields = fields
+
+    def text(self, revision):
+        return revision_text(revision.post_id, revision.number)
+    text.short_description = 'Текст версии'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
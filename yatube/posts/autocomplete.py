@@ -0,0 +1,152 @@
+"""Поиск по префиксу среди пользователей, групп и хештегов.
+
+Индекс — отсортированный список ключей в памяти процесса, поиск идёт
+бисекцией без обращения к базе. Процессы узнают об изменениях по версии
+в файле AUTOCOMPLETE_VERSION_FILE: свои добавления процесс вносит
+в индекс сам, а при чужих изменениях, переименованиях и удалениях индекс
+собирается заново. Изменения применяются после коммита транзакции, чтобы
+откат не оставлял в индексе несуществующих записей.
+"""
+import fcntl
+from bisect import bisect_left
+
+from django.conf import settings
+from django.db import transaction
+from django.http import JsonResponse
+from django.urls import reverse
+
+from posts.models import Group, Tag, User
+
+URL_NAMES = {
+    'user': ('posts:profile', 'username'),
+    'group': ('posts:group_list', 'slug'),
+    'tag': ('posts:tag_posts', 'name'),
+}
+
+
+class PrefixIndex:
+    __slots__ = ('keys', 'entries')
+
+    def __init__(self, items):
+        items = sorted(items)
+        self.keys = [key for key, _ in items]
+        # (тип, значение для адреса, подпись)
+        self.entries = [entry for _, entry in items]
+
+    def add(self, key, entry):
+        position = bisect_left(self.keys, key)
+        self.keys.insert(position, key)
+        self.entries.insert(position, entry)
+
+    def search(self, prefix, limit):
+        prefix = prefix.lower()
+        found = {}
+        position = bisect_left(self.keys, prefix)
+        while (
+            position < len(self.keys)
+            and self.keys[position].startswith(prefix)
+            and len(found) < limit
+        ):
+            entry = self.entries[position]
+            # Группа находится и по названию, и по слагу.
+            found.setdefault(entry[:2], entry)
+            position += 1
+        return list(found.values())
+
+
+def user_items(username):
+    return [(username.lower(), ('user', username, username))]
+
+
+def group_items(slug, title):
+    entry = ('group', slug, title)
+    return [(title.lower(), entry), (slug.lower(), entry)]
+
+
+def tag_items(name):
+    return [(name, ('tag', name, f'#{name}'))]
+
+
+def build_index():
+    items = []
+    for username in User.objects.values_list('username', flat=True):
+        items += user_items(username)
+    for slug, title in Group.objects.values_list('slug', 'title'):
+        items += group_items(slug, title)
+    for name in Tag.objects.values_list('name', flat=True):
+        items += tag_items(name)
+    return PrefixIndex(items)
+
+
+_state = {'index': None, 'version': None}
+
+
+def get_version():
+    try:
+        with open(settings.AUTOCOMPLETE_VERSION_FILE) as version_file:
+            fcntl.flock(version_file, fcntl.LOCK_SH)
+            return int(version_file.read() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def get_index():
+    version = get_version()
+    if _state['index'] is None or _state['version'] != version:
+        _state['index'] = build_index()
+        _state['version'] = version
+    return _state['index']
+
+
+def bump_version():
+    """Увеличивает версию под блокировкой файла: (прежняя, новая)."""
+    with open(settings.AUTOCOMPLETE_VERSION_FILE, 'a+') as version_file:
+        fcntl.flock(version_file, fcntl.LOCK_EX)
+        version_file.seek(0)
+        version = int(version_file.read() or 0)
+        version_file.truncate(0)
+        version_file.write(str(version + 1))
+    return version, version + 1
+
+
+def drop_index():
+    bump_version()
+    _state['index'] = None
+
+
+def invalidate():
+    transaction.on_commit(drop_index)
+
+
+def add_items(items):
+    previous, version = bump_version()
+    index = _state['index']
+    # Между нашими правками версию поднял другой процесс: пересобираем.
+    if index is None or _state['version'] != previous:
+        _state['index'] = None
+        return
+    for key, entry in items:
+        index.add(key, entry)
+    _state['version'] = version
+
+
+def add(items):
+    """Вносит новые ключи в индекс этого процесса, остальные пересоберут."""
+    items = list(items)
+    transaction.on_commit(lambda: add_items(items))
+
+
+def autocomplete(request):
+    prefix = request.GET.get('q', '').strip()
+    results = []
+    if prefix:
+        for kind, value, label in get_index().search(
+            prefix, settings.AUTOCOMPLETE_LIMIT,
+        ):
+            url_name, kwarg = URL_NAMES[kind]
+            results.append({
+                'type': kind,
+                'label': label,
+                'url': reverse(url_name, kwargs={kwarg: value}),
+            })
+    return JsonResponse({'results': results})
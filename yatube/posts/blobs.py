@@ -0,0 +1,24 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from posts.models import ImageBlob
+
+
+def incref(name):
+    if not name:
+        return
+    blobs = ImageBlob.objects.filter(name=name)
+    if blobs.update(refs=F('refs') + 1):
+        return
+    try:
+        with transaction.atomic():
+            ImageBlob.objects.create(name=name, refs=1)
+    except IntegrityError:
+        blobs.update(refs=F('refs') + 1)
+
+
+def decref(name):
+    if name:
+        ImageBlob.objects.filter(name=name, refs__gt=0).update(
+            refs=F('refs') - 1,
+        )
@@ -0,0 +1,99 @@
+import hashlib
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+
+from core.cache import is_shared
+from posts.models import Follow, Group
+
+POSTS_VERSION_KEY = 'posts:version'
+
+
+def group_cache_key(slug):
+    # Слаг может быть не ASCII, а memcached принимает только ASCII-ключи.
+    return 'group:{}'.format(hashlib.md5(slug.encode()).hexdigest())
+
+
+def get_group_or_404(slug):
+    """Возвращает группу по слагу, не обращаясь к базе при попадании в кеш.
+
+    В кеше процесса группа не хранится: переименование сбросило бы
+    копию только в том воркере, где группу сохранили.
+    """
+    if not is_shared():
+        return get_object_or_404(Group, slug=slug)
+    key = group_cache_key(slug)
+    group = cache.get(key)
+    if group is None:
+        group = get_object_or_404(Group, slug=slug)
+        cache.set(key, group, settings.GROUP_CACHE_TIMEOUT)
+    return group
+
+
+def invalidate_group(*slugs):
+    cache.delete_many([group_cache_key(slug) for slug in slugs if slug])
+
+
+def get_posts_version():
+    """Номер версии постов: меняется при любом изменении постов и групп."""
+    return cache.get_or_set(POSTS_VERSION_KEY, 1, None)
+
+
+def bump_posts_version():
+    cache.add(POSTS_VERSION_KEY, 1, None)
+    try:
+        cache.incr(POSTS_VERSION_KEY)
+    except ValueError:
+        cache.set(POSTS_VERSION_KEY, 2, None)
+
+
+def following_cache_key(user_id):
+    return f'following:{user_id}'
+
+
+def load_following_ids(user_id):
+    return array('q', sorted(
+        Follow.objects.filter(user_id=user_id).values_list(
+            'author_id', flat=True,
+        )
+    ))
+
+
+def get_following_ids(user_id):
+    """Возвращает отсортированный массив id авторов, на которых подписан
+    пользователь. Таблица подписок читается только при промахе кеша.
+
+    Кеш процесса не используется: (от)писка сбросила бы его только
+    в том воркере, который её обработал.
+    """
+    if not is_shared():
+        return load_following_ids(user_id)
+    key = following_cache_key(user_id)
+    author_ids = cache.get(key)
+    if author_ids is None:
+        author_ids = load_following_ids(user_id)
+        cache.set(key, author_ids, settings.FOLLOW_CACHE_TIMEOUT)
+    return author_ids
+
+
+def is_following(user_id, author_id):
+    author_ids = get_following_ids(user_id)
+    index = bisect_left(author_ids, author_id)
+    return index < len(author_ids) and author_ids[index] == author_id
+
+
+def invalidate_following(user_id):
+    """Сбрасывает кеш подписок; следующее чтение соберёт его из базы.
+
+    Правка закешированного массива на месте теряла бы параллельные
+    подписки. Ключ удаляется сразу, чтобы эта же транзакция видела
+    изменение, и ещё раз после коммита — на случай, если другой запрос
+    успел закешировать состояние до коммита.
+    """
+    key = following_cache_key(user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,155 @@
+import hashlib
+import io
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+from django.views.decorators.http import condition
+
+from core.cache import is_shared
+from posts.caching import get_group_or_404, get_posts_version
+from posts.models import Post, User
+
+
+class StreamingFeedMixin:
+    """Отдаёт XML ленты кусками: шапку и затем по одному элементу."""
+
+    def stream(self, encoding='utf-8'):
+        buffer = io.StringIO()
+        handler = SimplerXMLGenerator(buffer, encoding)
+
+        def drain():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk.encode(encoding)
+
+        self.start_feed(handler)
+        yield drain()
+        for item in self.items:
+            handler.startElement(
+                self.item_element, self.item_attributes(item),
+            )
+            self.add_item_elements(handler, item)
+            handler.endElement(self.item_element)
+            yield drain()
+        self.end_feed(handler)
+        yield drain()
+
+
+class StreamingRssFeed(StreamingFeedMixin, Rss201rev2Feed):
+    item_element = 'item'
+
+    def start_feed(self, handler):
+        handler.startDocument()
+        handler.startElement('rss', self.rss_attributes())
+        handler.startElement('channel', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_feed(self, handler):
+        self.endChannelElement(handler)
+        handler.endElement('rss')
+
+
+class StreamingAtomFeed(StreamingFeedMixin, Atom1Feed):
+    item_element = 'entry'
+
+    def start_feed(self, handler):
+        handler.startDocument()
+        handler.startElement('feed', self.root_attributes())
+        self.add_root_elements(handler)
+
+    def end_feed(self, handler):
+        handler.endElement('feed')
+
+
+FEED_CLASSES = {
+    'rss': StreamingRssFeed,
+    'atom': StreamingAtomFeed,
+}
+
+
+def feed_cache_key(request, kind, scope, value):
+    # В ленте абсолютные ссылки, поэтому схема и хост входят в ключ.
+    source = f'{request.scheme}://{request.get_host()}:{kind}:{scope}:{value}'
+    digest = hashlib.md5(source.encode()).hexdigest()
+    return f'feed:{get_posts_version()}:{digest}'
+
+
+def feed_etag(request, kind, scope='index', value=''):
+    # Считается без запросов к базе, поэтому 304 почти ничего не стоит.
+    # Версия постов в кеше процесса не видит чужих правок — тогда без ETag.
+    if not is_shared():
+        return None
+    return feed_cache_key(request, kind, scope, value)
+
+
+def build_feed(request, kind, scope, value):
+    posts = Post.objects.published().select_related('author', 'group')
+    if scope == 'group':
+        group = get_group_or_404(value)
+        posts = posts.filter(group_id=group.pk)
+        title = f'Записи сообщества {group.title}'
+        link = reverse('posts:group_list', kwargs={'slug': value})
+    elif scope == 'profile':
+        author = get_object_or_404(User, username=value)
+        posts = posts.filter(author_id=author.pk)
+        title = f'Посты пользователя {author.username}'
+        link = reverse('posts:profile', kwargs={'username': value})
+    else:
+        title = 'Последние обновления на сайте'
+        link = reverse('posts:index')
+    feed = FEED_CLASSES[kind](
+        title=title,
+        link=request.build_absolute_uri(link),
+        description=title,
+        feed_url=request.build_absolute_uri(),
+        language='ru',
+    )
+    for post in posts[:settings.FEED_ITEMS]:
+        url = request.build_absolute_uri(
+            reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        )
+        feed.add_item(
+            title=post.excerpt,
+            link=url,
+            description=post.text_html,
+            unique_id=url,
+            pubdate=post.pub_date,
+            updateddate=post.updated,
+            author_name=post.author.username,
+            categories=[post.group.title] if post.group else None,
+        )
+    return feed
+
+
+def cache_chunks(chunks, key):
+    collected = []
+    for chunk in chunks:
+        collected.append(chunk)
+        yield chunk
+    cache.set(key, collected, settings.FEED_CACHE_TIMEOUT)
+
+
+@condition(etag_func=feed_etag)
+def feed(request, kind, scope='index', value=''):
+    if kind not in FEED_CLASSES:
+        raise Http404('Неизвестный формат ленты.')
+    if not is_shared():
+        return StreamingHttpResponse(
+            build_feed(request, kind, scope, value).stream(),
+            content_type=FEED_CLASSES[kind].content_type,
+        )
+    key = feed_cache_key(request, kind, scope, value)
+    chunks = cache.get(key)
+    if chunks is None:
+        chunks = cache_chunks(
+            build_feed(request, kind, scope, value).stream(), key,
+        )
+    return StreamingHttpResponse(
+        chunks, content_type=FEED_CLASSES[kind].content_type,
+    )
@@ -1,6 +1,9 @@
 from django import forms
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
 
 from .models import Comment, Post
+from .uploads import check_image, normalize_image
 
 
 class PostForm(forms.ModelForm):
@@ -14,6 +17,68 @@ class PostForm(forms.ModelForm):
             'group': 'Из уже существующих групп.',
         }
 
+    def clean_image(self):
+        image = self.cleaned_data.get('image')
+        if not isinstance(image, UploadedFile):
+            return image
+        check_image(image)
+        return normalize_image(image)
+
+
+class PublishForm(forms.Form):
+    """Когда публиковать пост: сразу, позже или оставить черновиком."""
+
+    NOW = 'now'
+    SCHEDULE = 'schedule'
+    DRAFT = 'draft'
+
+    mode = forms.ChoiceField(
+        label='Публикация',
+        choices=(
+            (NOW, 'Опубликовать сразу'),
+            (SCHEDULE, 'Опубликовать позже'),
+            (DRAFT, 'Сохранить черновик'),
+        ),
+        initial=NOW,
+        required=False,
+    )
+    published_at = forms.DateTimeField(
+        label='Время публикации',
+        required=False,
+        help_text='Только для отложенной публикации.',
+    )
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # Без явного выбора сохраняем то, что было у поста.
+        cleaned_data['mode'] = (
+            cleaned_data.get('mode') or self.initial.get('mode') or self.NOW
+        )
+        published_at = (
+            cleaned_data.get('published_at')
+            or self.initial.get('published_at')
+        )
+        cleaned_data['published_at'] = published_at
+        if cleaned_data['mode'] == self.SCHEDULE:
+            if published_at is None:
+                self.add_error('published_at', 'Укажите время публикации.')
+            elif published_at <= timezone.now():
+                self.add_error(
+                    'published_at', 'Время публикации уже прошло.',
+                )
+        return cleaned_data
+
+    def apply(self, post):
+        mode = self.cleaned_data['mode']
+        post.is_published = mode == self.NOW
+        if mode == self.NOW:
+            post.pub_date = timezone.now()
+            post.published_at = post.pub_date
+        elif mode == self.SCHEDULE:
+            post.published_at = self.cleaned_data['published_at']
+        else:
+            post.published_at = None
+
 
 class CommentForm(forms.ModelForm):
     class Meta:
@@ -0,0 +1,69 @@
+import statistics
+import time
+import tracemalloc
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.template.loader import get_template
+
+from posts.models import Post
+from posts.rows import feed, make_rows
+
+
+def model_page(size):
+    return list(
+        Post.objects.published().select_related('author', 'group')[:size]
+    )
+
+
+def row_page(size):
+    return make_rows(feed(Post.objects.published())[:size])
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает страницу ленты из моделей и из облегчённых строк: '
+        'память и время выборки с отрисовкой.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=settings.FIRST_TEN_VALUE,
+            help='Постов на странице.',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20, help='Число повторов.',
+        )
+
+    def measure(self, fetch, size, repeat):
+        template = get_template('includes/post.html')
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            for post in fetch(size):
+                template.render({'post': post})
+            timings.append((time.perf_counter() - started) * 1000)
+        tracemalloc.start()
+        page = fetch(size)
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del page
+        return statistics.median(timings), memory
+
+    def handle(self, *args, **options):
+        size, repeat = options['size'], options['repeat']
+        results = {
+            'модели': self.measure(model_page, size, repeat),
+            'строки': self.measure(row_page, size, repeat),
+        }
+        for name, (elapsed, memory) in results.items():
+            self.stdout.write(
+                f'{name}: {elapsed:.2f} мс, {memory / 1024:.1f} КиБ '
+                f'на страницу из {size}'
+            )
+        (model_time, model_memory), (row_time, row_memory) = results.values()
+        self.stdout.write(self.style.SUCCESS(
+            f'Экономия: {100 - 100 * row_memory / max(model_memory, 1):.0f}% '
+            f'памяти, {100 - 100 * row_time / max(model_time, 1e-9):.0f}% '
+            'времени'
+        ))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.suggestions import build_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рекомендации подписок по графу подписок.'
+
+    def handle(self, *args, **options):
+        users = build_suggestions()
+        self.stdout.write(
+            self.style.SUCCESS(f'Рекомендации посчитаны для {users} польз.')
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.sitemaps import build_sitemaps
+
+
+class Command(BaseCommand):
+    help = (
+        'Дописывает карту сайта: перестраивает последний неполный файл '
+        'каждого раздела и добавляет новые.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true',
+            help=(
+                'Собрать все файлы заново; нужно, чтобы обновить даты '
+                'изменённых постов и убрать удалённые.'
+            ),
+        )
+
+    def handle(self, *args, **options):
+        state = build_sitemaps(full=options['full'])
+        for section, chunks in state.items():
+            total = sum(chunk['count'] for chunk in chunks)
+            self.stdout.write(
+                f'{section}: адресов {total}, файлов {len(chunks)}'
+            )
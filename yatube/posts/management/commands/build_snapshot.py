@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.snapshot import (
+    collect_urls,
+    moved_post_ids,
+    placements,
+    prune,
+    render_urls,
+    stale_post_ids,
+)
+
+STATE_FILE = '.snapshot.json'
+
+
+class Command(BaseCommand):
+    help = (
+        'Сохраняет главную, страницы групп, профилей и постов '
+        'в статические HTML-файлы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=str(settings.SNAPSHOT_ROOT),
+            help='Каталог для HTML-файлов.',
+        )
+        parser.add_argument(
+            '--full', action='store_true',
+            help=(
+                'Перерисовать всё с нуля; нужно после правок '
+                'через QuerySet.update() без поля updated.'
+            ),
+        )
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            help='Число процессов для отрисовки.',
+        )
+
+    def handle(self, *args, **options):
+        output = options['output']
+        state_path = os.path.join(output, STATE_FILE)
+        since = None
+        placed = {}
+        if options['full']:
+            shutil.rmtree(output, ignore_errors=True)
+        elif os.path.exists(state_path):
+            with open(state_path) as state:
+                previous = json.load(state)
+            since = parse_datetime(previous['last_run'])
+            placed = previous.get('posts', {})
+        started = timezone.now()
+        current = placements()
+        stale = set()
+        if since is not None:
+            stale = stale_post_ids(output) | moved_post_ids(placed, current)
+        urls = collect_urls(since, stale)
+        results = render_urls(urls, output, options['workers'])
+        for url, status in results:
+            if status != 200:
+                self.stderr.write(f'{url}: {status}')
+        os.makedirs(output, exist_ok=True)
+        if stale:
+            self.stdout.write(f'Удалено страниц: {prune(output, urls)}')
+        with open(state_path, 'w') as state:
+            json.dump(
+                {'last_run': started.isoformat(), 'posts': current}, state,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f'Сохранено страниц: {len(results)}')
+        )
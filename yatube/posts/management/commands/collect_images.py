@@ -0,0 +1,81 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import delete
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ImageBlob, Post
+from posts.storage import TMP_DIR
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов, на которые больше нет ссылок, '
+        'вместе с их миниатюрами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--grace', type=int, default=60 * 60,
+            help=(
+                'Не трогать файлы моложе стольких секунд: '
+                'пост с ними может ещё сохраняться.'
+            ),
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.',
+        )
+
+    def handle(self, *args, **options):
+        self.storage = Post._meta.get_field('image').storage
+        self.dry_run = options['dry_run']
+        deadline = time.time() - options['grace']
+        removed = 0
+        for blob in ImageBlob.objects.filter(refs=0).iterator():
+            if Post.objects.filter(image=blob.name).exists():
+                continue
+            if self.is_young(blob.name, deadline):
+                continue
+            self.remove(blob.name)
+            if not self.dry_run:
+                blob.delete()
+            removed += 1
+        removed += self.remove_orphans(deadline)
+        self.stdout.write(self.style.SUCCESS(f'Удалено файлов: {removed}'))
+
+    def is_young(self, name, deadline):
+        path = self.storage.path(name)
+        return os.path.exists(path) and os.path.getmtime(path) > deadline
+
+    def remove(self, name):
+        self.stdout.write(name)
+        if not self.dry_run:
+            delete(ImageFile(name, self.storage))
+
+    def remove_orphans(self, deadline):
+        """Удаляет файлы на диске, о которых не знает ни один пост."""
+        upload_to = Post._meta.get_field('image').upload_to.strip('/')
+        root = self.storage.path(upload_to)
+        known = set(ImageBlob.objects.values_list('name', flat=True))
+        removed = 0
+        for dirpath, dirnames, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(
+                    path, self.storage.location,
+                ).replace(os.sep, '/')
+                if name in known or os.path.getmtime(path) > deadline:
+                    continue
+                if Post.objects.filter(image=name).exists():
+                    continue
+                self.remove(name)
+                removed += 1
+        tmp_root = self.storage.path(TMP_DIR)
+        if os.path.isdir(tmp_root) and not self.dry_run:
+            for filename in os.listdir(tmp_root):
+                path = os.path.join(tmp_root, filename)
+                if os.path.getmtime(path) <= deadline:
+                    os.remove(path)
+        return removed
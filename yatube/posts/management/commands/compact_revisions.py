@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.models import PostRevision
+from posts.revisions import compact_post
+
+
+class Command(BaseCommand):
+    help = (
+        'Прореживает старые версии постов до одной в день '
+        'и перекодирует оставшиеся.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.REVISION_COMPACT_AFTER_DAYS,
+            help='Версии старше стольких дней прореживаются.',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        post_ids = PostRevision.objects.filter(
+            created__lt=cutoff,
+        ).order_by().values_list('post_id', flat=True).distinct()
+        dropped = sum(
+            compact_post(post_id, cutoff) for post_id in list(post_ids)
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Удалено версий: {dropped}'
+        ))
@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.publishing import publish_due
+
+
+class Command(BaseCommand):
+    help = 'Публикует отложенные посты, время которых наступило.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Не завершаться, а проверять очередь каждые --interval с.',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=settings.PUBLISH_INTERVAL,
+            help='Пауза между проверками, секунд.',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.PUBLISH_BATCH_SIZE,
+            help='Сколько постов публиковать одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            published = publish_due(batch_size=options['batch_size'])
+            if published:
+                self.stdout.write(f'Опубликовано постов: {published}')
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
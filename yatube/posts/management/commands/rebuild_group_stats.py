@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import refresh_group_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику групп по таблице постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'group_ids', nargs='*', type=int,
+            help='Идентификаторы групп; по умолчанию все группы.',
+        )
+
+    def handle(self, *args, **options):
+        refresh_group_stats(options['group_ids'] or None)
+        self.stdout.write(self.style.SUCCESS('Статистика групп обновлена.'))
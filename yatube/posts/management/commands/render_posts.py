@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заново формирует HTML и начало текста для всех постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов обновлять одним запросом.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        batch = []
+        total = 0
+        for post in Post.objects.only('pk', 'text').iterator():
+            post.render_text()
+            batch.append(post)
+            if len(batch) == batch_size:
+                Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+                total += len(batch)
+                batch = []
+        Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+        total += len(batch)
+        self.stdout.write(self.style.SUCCESS(f'Обновлено постов: {total}'))
@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts import autocomplete
+from posts.models import Post, PostTag, Tag
+from posts.rendering import parse_tags
+from posts.tags import add_links
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново разбирает хештеги всех опубликованных постов '
+        'и пересобирает индекс тегов со счётчиками.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Сколько постов разбирать за один проход.',
+        )
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        PostTag.objects.all().delete()
+        Tag.objects.update(posts_count=0)
+        posts = Post.objects.published().order_by('pk').values_list(
+            'pk', 'text', 'pub_date',
+        )
+        last_pk = 0
+        links = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            links += add_links(
+                (pk, parse_tags(text), pub_date)
+                for pk, text, pub_date in batch
+            )
+            last_pk = batch[-1][0]
+        removed, _ = Tag.objects.filter(posts_count=0).delete()
+        if removed:
+            autocomplete.invalidate()
+        self.stdout.write(self.style.SUCCESS(
+            f'Связей с тегами: {links}, удалено пустых тегов: {removed}'
+        ))
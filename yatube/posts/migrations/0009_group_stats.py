@@ -0,0 +1,88 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:27
+
+import json
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max
+
+
+def fill_group_stats(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    GroupAuthorStats = apps.get_model('posts', 'GroupAuthorStats')
+    Post = apps.get_model('posts', 'Post')
+    for group_id in Group.objects.values_list('pk', flat=True):
+        posts = Post.objects.filter(group_id=group_id).order_by()
+        per_author = list(
+            posts.values('author_id', 'author__username').annotate(
+                posts_count=Count('pk'),
+            ).order_by('-posts_count', 'author_id')
+        )
+        GroupAuthorStats.objects.bulk_create(
+            GroupAuthorStats(
+                group_id=group_id,
+                author_id=row['author_id'],
+                posts_count=row['posts_count'],
+            )
+            for row in per_author
+        )
+        GroupStats.objects.create(
+            group_id=group_id,
+            top_authors=json.dumps(
+                [
+                    {
+                        'username': row['author__username'],
+                        'posts_count': row['posts_count'],
+                    }
+                    for row in per_author[:3]
+                ],
+                ensure_ascii=False,
+            ),
+            **posts.aggregate(
+                posts_count=Count('pk'),
+                last_activity=Max('pub_date'),
+            ),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0008_auto_20230317_1449'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group', verbose_name='Группа')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('last_activity', models.DateTimeField(blank=True, null=True, verbose_name='Последняя активность')),
+                ('top_authors', models.TextField(default='[]', verbose_name='Самые активные авторы')),
+            ],
+            options={
+                'ordering': ['-last_activity'],
+            },
+        ),
+        migrations.CreateModel(
+            name='GroupAuthorStats',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество постов')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='group_stats', to=settings.AUTH_USER_MODEL, verbose_name='Автор')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='author_stats', to='posts.Group', verbose_name='Группа')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupauthorstats',
+            index=models.Index(fields=['group', '-posts_count'], name='group_author_top_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='groupauthorstats',
+            constraint=models.UniqueConstraint(fields=('group', 'author'), name='unique_group_author'),
+        ),
+        migrations.RunPython(fill_group_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:28
+
+from django.db import migrations, models
+
+from posts.rendering import make_excerpt, render_text
+
+
+def render_posts(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    batch = []
+    for post in Post.objects.only('pk', 'text').iterator():
+        post.text_html = render_text(post.text)
+        post.excerpt = make_excerpt(post.text)
+        batch.append(post)
+        if len(batch) == 500:
+            Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+            batch = []
+    Post.objects.bulk_update(batch, ['text_html', 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_group_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False, verbose_name='Начало текста поста'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='text_html',
+            field=models.TextField(blank=True, editable=False, verbose_name='Текст поста в HTML'),
+        ),
+        migrations.RunPython(render_posts, migrations.RunPython.noop),
+    ]
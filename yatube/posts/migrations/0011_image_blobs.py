@@ -0,0 +1,44 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:29
+
+from django.db import migrations, models
+from django.db.models import Count
+
+import posts.storage
+
+
+def count_image_refs(apps, schema_editor):
+    ImageBlob = apps.get_model('posts', 'ImageBlob')
+    Post = apps.get_model('posts', 'Post')
+    ImageBlob.objects.bulk_create(
+        (
+            ImageBlob(name=row['image'], refs=row['refs'])
+            for row in Post.objects.exclude(image='').order_by().values(
+                'image',
+            ).annotate(refs=Count('pk'))
+        ),
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_text_html'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageBlob',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Путь к файлу')),
+                ('refs', models.PositiveIntegerField(default=0, verbose_name='Количество ссылок')),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, storage=posts.storage.ContentAddressedStorage(), upload_to='posts/', verbose_name='Картинка'),
+        ),
+        migrations.RunPython(count_image_refs, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 2.2.16 on 2026-10-19 10:49
+
+from django.db import migrations, models
+
+
+def fill_published_at(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Post.objects.filter(published_at__isnull=True).update(
+        published_at=models.F('pub_date'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_updated'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_pub_date_idx',
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='is_published',
+            field=models.BooleanField(default=True, verbose_name='Опубликован'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='published_at',
+            field=models.DateTimeField(blank=True, help_text='Для черновика пусто, для отложенного поста — в будущем.', null=True, verbose_name='Время публикации'),
+        ),
+        migrations.RunPython(fill_published_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_published=True), fields=['-pub_date'], name='post_published_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(is_published=False), fields=['published_at'], name='post_scheduled_idx'),
+        ),
+    ]
@@ -1,7 +1,13 @@
+import json
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
-from yatube.settings import FIRST_FIFTEEN_VALUE
+from posts.rendering import make_excerpt, render_text
+from posts.storage import ContentAddressedStorage
 
 
 User = get_user_model()
@@ -20,12 +26,26 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        return self.filter(is_published=True)
+
+    def due(self, now):
+        """Отложенные посты, время публикации которых наступило."""
+        return self.filter(is_published=False, published_at__lte=now)
+
+
 class Post(models.Model):
     text = models.TextField(verbose_name='Текст поста')
     pub_date = models.DateTimeField(
         auto_now_add=True,
         verbose_name='Дата публикации',
     )
+    updated = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name='Дата изменения',
+    )
     author = models.ForeignKey(
         User, on_delete=models.CASCADE,
         related_name='posts',
@@ -41,14 +61,90 @@ class Post(models.Model):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    text_html = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Текст поста в HTML',
+    )
+    excerpt = models.TextField(
+        blank=True,
+        editable=False,
+        verbose_name='Начало текста поста',
+    )
+    is_published = models.BooleanField(
+        default=True,
+        verbose_name='Опубликован',
+    )
+    published_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Время публикации',
+        help_text='Для черновика пусто, для отложенного поста — в будущем.',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            # Общий индекс нужен запросам без фильтра по is_published:
+            # админке и сортировке по умолчанию.
+            models.Index(fields=['-pub_date'], name='post_pub_date_idx'),
+            models.Index(
+                fields=['-pub_date'],
+                name='post_published_idx',
+                condition=Q(is_published=True),
+            ),
+            models.Index(
+                fields=['published_at'],
+                name='post_scheduled_idx',
+                condition=Q(is_published=False),
+            ),
+        ]
 
     def __str__(self):
-        return self.text[:FIRST_FIFTEEN_VALUE]
+        return self.text[:settings.FIRST_FIFTEEN_VALUE]
+
+    def render_text(self):
+        self.text_html = render_text(self.text)
+        self.excerpt = make_excerpt(self.text)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, '_loaded_values', {})
+        if not self.text_html or loaded.get('text') != self.text:
+            self.render_text()
+        # Прежний текст нужен сигналу, который ведёт историю правок.
+        self._previous_text = loaded.get('text')
+        self._loaded_values = dict(loaded, text=self.text)
+        if self.is_published and self.published_at is None:
+            self.published_at = timezone.now()
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Запоминаем исходные значения: по ним сигналы
+        # пересчитывают статистику групп при редактировании.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class ImageBlob(models.Model):
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Путь к файлу',
+    )
+    refs = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество ссылок',
+    )
+
+    def __str__(self):
+        return self.name
 
 
 class Comment(models.Model):
@@ -67,6 +163,7 @@ class Comment(models.Model):
     text = models.TextField(verbose_name='Текст комментария')
     created = models.DateTimeField(
         auto_now_add=True,
+        db_index=True,
         verbose_name='Дата публикации',
     )
 
@@ -96,3 +193,191 @@ class Follow(models.Model):
                 fields=['user', 'author'],
                 name='unique_following'),
         ]
+
+
+class GroupStats(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Группа',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+    last_activity = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Последняя активность',
+    )
+    top_authors = models.TextField(
+        default='[]',
+        verbose_name='Самые активные авторы',
+    )
+
+    class Meta:
+        ordering = ['-last_activity']
+
+    def __str__(self):
+        return str(self.group)
+
+    @property
+    def top_authors_list(self):
+        return json.loads(self.top_authors)
+
+
+class GroupAuthorStats(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='author_stats',
+        verbose_name='Группа',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='group_stats',
+        verbose_name='Автор',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['group', 'author'],
+                name='unique_group_author'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['group', '-posts_count'],
+                name='group_author_top_idx'),
+        ]
+
+
+class FollowSuggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follow_suggestions',
+        verbose_name='Пользователь',
+    )
+    suggested = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Рекомендуемый автор',
+    )
+    score = models.FloatField(verbose_name='Оценка')
+
+    class Meta:
+        ordering = ['-score']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'suggested'],
+                name='unique_follow_suggestion'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['user', '-score'],
+                name='follow_suggestion_user_idx'),
+        ]
+
+
+class PostRevision(models.Model):
+    """Версия текста поста.
+
+    Хранится либо целиком (снимок), либо как сжатая разница с предыдущей
+    версией; снимок делается каждые REVISION_SNAPSHOT_EVERY версий.
+    """
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        verbose_name='Пост',
+    )
+    number = models.PositiveIntegerField(verbose_name='Номер версии')
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата правки',
+    )
+    editor = models.ForeignKey(
+        User,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+',
+        verbose_name='Автор правки',
+    )
+    is_snapshot = models.BooleanField(
+        default=False,
+        verbose_name='Полный текст',
+    )
+    data = models.BinaryField(verbose_name='Сжатые данные')
+
+    class Meta:
+        ordering = ['post', '-number']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['post', 'number'],
+                name='unique_post_revision'),
+        ]
+
+    def __str__(self):
+        return f'{self.post_id} v{self.number}'
+
+
+class Tag(models.Model):
+    name = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name='Хештег',
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Количество постов',
+    )
+
+    class Meta:
+        ordering = ['-posts_count']
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Связь хештега с опубликованным постом.
+
+    Дата публикации продублирована, чтобы лента тега читалась
+    по индексу (tag, -pub_date) без сортировки постов.
+    """
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Хештег',
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='post_tags',
+        verbose_name='Пост',
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        ordering = ['-pub_date']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['tag', 'post'],
+                name='unique_post_tag'),
+        ]
+        indexes = [
+            models.Index(
+                fields=['tag', '-pub_date'],
+                name='post_tag_feed_idx'),
+        ]
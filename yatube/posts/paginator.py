@@ -0,0 +1,131 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from core.cache import is_shared
+from posts.caching import get_posts_version
+
+
+def can_estimate(queryset):
+    return connections[queryset.db].vendor == 'postgresql'
+
+
+def estimate_count(queryset):
+    """Оценка числа строк по плану запроса PostgreSQL."""
+    connection = connections[queryset.db]
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def encode_cursor(pub_date, pk):
+    return f'{pub_date.isoformat()}_{pk}'
+
+
+def decode_cursor(cursor):
+    """(дата, id) из курсора; None для пустого или испорченного."""
+    date, _, pk = (cursor or '').rpartition('_')
+    try:
+        date = parse_datetime(date)
+        pk = int(pk)
+    except ValueError:
+        return None
+    return (date, pk) if date is not None else None
+
+
+def cursor_page(queryset, cursor, per_page, date_field='pub_date',
+                pk_field='pk'):
+    """Страница по курсору: записи старше курсора и курсор следующей.
+
+    В отличие от OFFSET, глубокие страницы стоят столько же, сколько
+    первая: запрос идёт по индексу (…, -date) с места остановки.
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        date, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': date})
+            | Q(**{date_field: date, f'{pk_field}__lt': pk})
+        )
+    items = list(
+        queryset.order_by(f'-{date_field}', f'-{pk_field}')[:per_page + 1]
+    )
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        last = items[-1]
+        next_cursor = encode_cursor(
+            getattr(last, date_field), getattr(last, pk_field),
+        )
+    return items, next_cursor
+
+
+def page_window(page):
+    """Номера страниц вокруг текущей вместо полного списка."""
+    on_each_side = settings.PAGINATOR_ON_EACH_SIDE
+    start = max(1, page.number - on_each_side)
+    end = min(page.paginator.num_pages, page.number + on_each_side)
+    return range(start, end + 1)
+
+
+class CachedCountPaginator(Paginator):
+    """Пагинатор, который не пересчитывает COUNT(*) на каждый запрос.
+
+    Число записей кешируется по тексту SQL запроса и версии постов,
+    поэтому любое изменение постов или групп сбрасывает кеш. В кеше
+    процесса счёт не хранится: версию там меняет только тот воркер,
+    который сохранил пост.
+    Если записей больше порога, точный счёт заменяется оценкой.
+    make_rows, если задан, превращает срез страницы в объекты для шаблона.
+    """
+
+    def __init__(self, *args, make_rows=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.make_rows = make_rows
+
+    def _get_page(self, object_list, number, paginator):
+        if self.make_rows is not None:
+            object_list = self.make_rows(object_list)
+        return super()._get_page(object_list, number, paginator)
+
+    def count_cache_key(self):
+        query = str(self.object_list.query).encode()
+        return 'paginator:count:{}:{}'.format(
+            get_posts_version(), hashlib.md5(query).hexdigest(),
+        )
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        if not is_shared():
+            return self.count_queryset()
+        try:
+            key = self.count_cache_key()
+        except EmptyResultSet:
+            return 0
+        count = cache.get(key)
+        if count is None:
+            count = self.count_queryset()
+            cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def count_queryset(self):
+        queryset = self.object_list.order_by()
+        if not can_estimate(queryset):
+            # Без оценки ограниченный счёт лишь добавил бы второй запрос.
+            return queryset.count()
+        threshold = settings.PAGINATOR_ESTIMATE_THRESHOLD
+        count = queryset.values('pk')[:threshold + 1].count()
+        if count <= threshold:
+            return count
+        return max(estimate_count(queryset), count)
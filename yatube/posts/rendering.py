@@ -0,0 +1,29 @@
+import re
+
+from django.urls import reverse
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 30
+
+# Решётка после буквы, «&» или другой решётки — это не хештег
+# (якорь в ссылке, HTML-сущность вроде &#39;).
+HASHTAG_RE = re.compile(r'(?<![\w&#])#(\w{1,50})')
+
+
+def parse_tags(text):
+    return sorted({name.lower() for name in HASHTAG_RE.findall(text)})
+
+
+def link_tag(match):
+    url = reverse('posts:tag_posts', args=[match.group(1).lower()])
+    return f'<a href="{url}">{match.group(0)}</a>'
+
+
+def render_text(text):
+    """Экранирует текст поста, расставляет абзацы и ссылки на хештеги."""
+    return HASHTAG_RE.sub(link_tag, linebreaks(text, autoescape=True))
+
+
+def make_excerpt(text):
+    return Truncator(text).words(EXCERPT_WORDS, truncate=' …')
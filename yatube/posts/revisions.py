@@ -0,0 +1,156 @@
+"""История правок постов: снимки и сжатые построчные разницы."""
+import json
+import zlib
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Q, Subquery
+
+from posts.models import Post, PostRevision
+
+
+def pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False).encode())
+
+
+def unpack(data):
+    return json.loads(zlib.decompress(bytes(data)))
+
+
+def make_delta(old, new):
+    """Построчная разница между двумя текстами.
+
+    Пара [начало, конец] копирует строки старого текста, строка
+    вставляет фрагмент нового.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    delta = []
+    for tag, i1, i2, j1, j2 in SequenceMatcher(
+        None, old_lines, new_lines, autojunk=False,
+    ).get_opcodes():
+        if tag == 'equal':
+            delta.append([i1, i2])
+        elif j1 < j2:
+            delta.append(''.join(new_lines[j1:j2]))
+    return delta
+
+
+def apply_delta(old, delta):
+    old_lines = old.splitlines(keepends=True)
+    return ''.join(
+        ''.join(old_lines[op[0]:op[1]]) if isinstance(op, list) else op
+        for op in delta
+    )
+
+
+def rebuild(rows):
+    """Собирает текст из снимка и следующих за ним разниц."""
+    text = None
+    for is_snapshot, data in rows:
+        value = unpack(data)
+        text = value if is_snapshot else apply_delta(text, value)
+    return text
+
+
+def revision_text(post_id, number):
+    """Текст версии: один запрос, не больше REVISION_SNAPSHOT_EVERY строк."""
+    revisions = PostRevision.objects.filter(post_id=post_id)
+    snapshot = revisions.filter(
+        is_snapshot=True, number__lte=number,
+    ).order_by('-number').values('number')[:1]
+    return rebuild(
+        revisions.filter(
+            number__gte=Subquery(snapshot), number__lte=number,
+        ).order_by('number').values_list('is_snapshot', 'data')
+    )
+
+
+def encode(number, text, previous):
+    """Поля новой версии после ``previous`` = (номер, номер снимка, текст)."""
+    every = settings.REVISION_SNAPSHOT_EVERY
+    if previous is None or number - previous[1] >= every:
+        return {'is_snapshot': True, 'data': pack(text)}
+    return {'is_snapshot': False, 'data': pack(make_delta(previous[2], text))}
+
+
+def lock_post(post_id):
+    Post.objects.select_for_update().only('pk').get(pk=post_id)
+
+
+@transaction.atomic
+def record_revision(post, previous_text, editor=None):
+    """Сохраняет новую версию текста поста.
+
+    У поста без истории сначала сохраняется прежний текст как версия 1.
+    """
+    # Блокируется строка поста: версий на первой правке ещё нет, а
+    # FOR UPDATE вместе с агрегатом PostgreSQL не принимает.
+    lock_post(post.pk)
+    last = PostRevision.objects.filter(
+        post_id=post.pk,
+    ).aggregate(
+        number=Max('number'),
+        snapshot=Max('number', filter=Q(is_snapshot=True)),
+    )
+    if last['number'] is None:
+        PostRevision.objects.create(
+            post_id=post.pk, number=1, **encode(1, previous_text, None),
+        )
+        previous = (1, 1, previous_text)
+    else:
+        previous = (
+            last['number'],
+            last['snapshot'],
+            revision_text(post.pk, last['number']),
+        )
+    number = previous[0] + 1
+    return PostRevision.objects.create(
+        post_id=post.pk,
+        number=number,
+        editor=editor,
+        **encode(number, post.text, previous),
+    )
+
+
+@transaction.atomic
+def compact_post(post_id, cutoff):
+    """Прореживает версии старше ``cutoff`` до одной в день.
+
+    Оставшиеся версии перекодируются заново, чтобы разницы ссылались
+    на соседние сохранённые версии. Возвращает число удалённых.
+    """
+    lock_post(post_id)
+    rows = list(
+        PostRevision.objects.filter(post_id=post_id).order_by('number')
+    )
+    kept = []
+    text = None
+    for position, revision in enumerate(rows):
+        value = unpack(revision.data)
+        text = value if revision.is_snapshot else apply_delta(text, value)
+        following = rows[position + 1] if position + 1 < len(rows) else None
+        if (
+            following is None
+            or revision.created >= cutoff
+            or following.created.date() != revision.created.date()
+        ):
+            kept.append((revision, text))
+    kept_pks = {revision.pk for revision, _ in kept}
+    dropped = [revision.pk for revision in rows if revision.pk not in kept_pks]
+    previous = None
+    for revision, text in kept:
+        fields = encode(revision.number, text, previous)
+        revision.is_snapshot = fields['is_snapshot']
+        revision.data = fields['data']
+        previous = (
+            revision.number,
+            revision.number if revision.is_snapshot else previous[1],
+            text,
+        )
+    PostRevision.objects.filter(pk__in=dropped).delete()
+    PostRevision.objects.bulk_update(
+        [revision for revision, _ in kept], ['is_snapshot', 'data'],
+    )
+    return len(dropped)
@@ -0,0 +1,92 @@
+from django.db.models.fields.files import ImageFieldFile
+
+from posts.models import Post
+
+# Колонки, которые нужны шаблонам лент, и ничего сверх них; image
+# рисует миниатюрой posts/includes/image.html.
+FEED_FIELDS = (
+    'pk',
+    'pub_date',
+    'text_html',
+    'image',
+    'author_id',
+    'author__username',
+    'group_id',
+    'group__slug',
+    'group__title',
+)
+
+
+class AuthorRow:
+    __slots__ = ('pk', 'username')
+
+    def __init__(self, pk, username):
+        self.pk = pk
+        self.username = username
+
+    def __str__(self):
+        return self.username
+
+
+class GroupRow:
+    __slots__ = ('pk', 'slug', 'title')
+
+    def __init__(self, pk, slug, title):
+        self.pk = pk
+        self.slug = slug
+        self.title = title
+
+    def __str__(self):
+        return self.title
+
+
+class PostRow:
+    """Пост в ленте: только поля шаблона, без состояния модели."""
+
+    __slots__ = ('pk', 'pub_date', 'text_html', 'image_name', 'author',
+                 'group')
+
+    def __init__(self, pk, pub_date, text_html, image_name, author, group):
+        self.pk = pk
+        self.pub_date = pub_date
+        self.text_html = text_html
+        self.image_name = image_name
+        self.author = author
+        self.group = group
+
+    @property
+    def id(self):
+        return self.pk
+
+    @property
+    def image(self):
+        field = Post._meta.get_field('image')
+        return ImageFieldFile(None, field, self.image_name)
+
+    def __repr__(self):
+        return f'<PostRow: {self.pk}>'
+
+
+def feed(queryset):
+    return queryset.values_list(*FEED_FIELDS)
+
+
+def make_rows(values):
+    """Строки values_list(*FEED_FIELDS) -> PostRow.
+
+    Авторы и группы на странице повторяются, поэтому объект каждого
+    создаётся один раз и разделяется между постами.
+    """
+    authors, groups, rows = {}, {}, []
+    for (pk, pub_date, text_html, image, author_id, username,
+         group_id, slug, title) in values:
+        author = authors.get(author_id)
+        if author is None:
+            author = authors[author_id] = AuthorRow(author_id, username)
+        group = None
+        if group_id is not None:
+            group = groups.get(group_id)
+            if group is None:
+                group = groups[group_id] = GroupRow(group_id, slug, title)
+        rows.append(PostRow(pk, pub_date, text_html, image, author, group))
+    return rows
@@ -0,0 +1,166 @@
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from posts import autocomplete, blobs, revisions, stats, tags
+from posts.caching import (
+    bump_posts_version,
+    invalidate_following,
+    invalidate_group,
+)
+from posts.models import Follow, Group, GroupStats, Post, User
+from posts.rendering import parse_tags
+
+# Поля поста, от которых зависит статистика групп.
+STATS_FIELDS = ('group_id', 'author_id', 'is_published')
+
+
+@receiver(pre_save, sender=Group)
+def remember_group_slug(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    instance._old_slug = Group.objects.filter(
+        pk=instance.pk,
+    ).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+def invalidate_group_on_save(sender, instance, raw=False, **kwargs):
+    invalidate_group(instance.slug, getattr(instance, '_old_slug', None))
+    if not raw:
+        GroupStats.objects.get_or_create(group=instance)
+
+
+@receiver(post_delete, sender=Group)
+def invalidate_group_on_delete(sender, instance, **kwargs):
+    invalidate_group(instance.slug)
+
+
+@receiver(post_save, sender=Post)
+def update_group_stats_on_save(sender, instance, created, raw=False,
+                               **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', None)
+    current = (instance.group_id, instance.author_id, instance.is_published)
+    if created:
+        if instance.is_published:
+            stats.apply_post(
+                instance.group_id, instance.author_id, instance.pub_date, 1,
+            )
+    elif loaded is None or not set(STATS_FIELDS) <= loaded.keys():
+        # Прежние значения неизвестны, пересчитываем группу целиком.
+        if instance.group_id is not None:
+            stats.refresh_group_stats([instance.group_id])
+    else:
+        previous = tuple(loaded[field] for field in STATS_FIELDS)
+        if previous != current:
+            # Черновики и отложенные посты в статистике не учитываются.
+            if previous[2]:
+                stats.apply_post(
+                    previous[0], previous[1], instance.pub_date, -1,
+                )
+            if current[2]:
+                stats.apply_post(
+                    current[0], current[1], instance.pub_date, 1,
+                )
+    instance._loaded_values = {
+        **(loaded or {}), **dict(zip(STATS_FIELDS, current)),
+    }
+
+
+@receiver(post_delete, sender=Post)
+def update_group_stats_on_delete(sender, instance, **kwargs):
+    if instance.is_published:
+        stats.apply_post(
+            instance.group_id, instance.author_id, instance.pub_date, -1,
+        )
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    loaded = getattr(instance, '_loaded_values', {})
+    old_name = None if created else loaded.get('image') or None
+    new_name = instance.image.name or None
+    if old_name != new_name:
+        blobs.incref(new_name)
+        blobs.decref(old_name)
+    instance._loaded_values = dict(loaded, image=new_name)
+
+
+@receiver(post_delete, sender=Post)
+def count_image_refs_on_delete(sender, instance, **kwargs):
+    blobs.decref(instance.image.name)
+
+
+@receiver(post_save, sender=Post)
+def record_revision_on_save(sender, instance, created, raw=False, **kwargs):
+    previous_text = getattr(instance, '_previous_text', None)
+    if created or raw or previous_text in (None, instance.text):
+        return
+    revisions.record_revision(
+        instance, previous_text, getattr(instance, '_editor', None),
+    )
+
+
+@receiver(post_save, sender=Post)
+def sync_tags_on_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        tags.sync_post_tags(instance, parse_tags(instance.text))
+
+
+@receiver(pre_delete, sender=Post)
+def untag_on_delete(sender, instance, **kwargs):
+    # После удаления связи уже сняты каскадом, счётчики правим до него.
+    tags.untag_post(instance.pk)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def bump_posts_version_on_change(sender, raw=False, **kwargs):
+    if not raw:
+        bump_posts_version()
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def invalidate_following_on_change(sender, instance, **kwargs):
+    invalidate_following(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def index_user_on_save(sender, instance, created, raw=False,
+                       update_fields=None, **kwargs):
+    if raw:
+        return
+    if created:
+        autocomplete.add(autocomplete.user_items(instance.username))
+    elif update_fields is None or 'username' in update_fields:
+        # Вход обновляет только last_login, индекс при этом не трогаем.
+        autocomplete.invalidate()
+
+
+@receiver(post_save, sender=Group)
+def index_group_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if created:
+        autocomplete.add(
+            autocomplete.group_items(instance.slug, instance.title)
+        )
+    else:
+        autocomplete.invalidate()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def unindex_on_delete(sender, **kwargs):
+    autocomplete.invalidate()
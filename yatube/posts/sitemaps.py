@@ -0,0 +1,193 @@
+"""Карта сайта, разбитая на файлы по SITEMAP_CHUNK_SIZE адресов.
+
+Каждый раздел (посты, профили, группы) читается по первичному ключу
+без OFFSET: очередной файл начинается с ключа, следующего за последним
+ключом предыдущего. Границы файлов хранятся в ``state.json``, поэтому
+при новых постах переписывается только последний неполный файл
+и добавляются новые. Отложенный пост получает ключ при создании,
+а публикуется позже и может попасть в диапазон уже заполненного файла:
+такой файл и все следующие собираются заново.
+
+Файлы собирает только команда build_sitemaps; представления отдают
+готовое и отвечают 404, пока её не запускали.
+"""
+import json
+import os
+import tempfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.http import FileResponse, Http404
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post, User
+
+STATE_FILE = 'state.json'
+
+INDEX_FILE = 'sitemap.xml'
+
+
+def post_entries(after, limit):
+    posts = Post.objects.published().filter(pk__gt=after).order_by('pk')
+    for pk, updated in posts.values_list(
+        'pk', 'updated',
+    )[:limit].iterator(chunk_size=2000):
+        yield pk, reverse('posts:post_detail', args=[pk]), updated
+
+
+def profile_entries(after, limit):
+    for pk, username in User.objects.filter(pk__gt=after).order_by(
+        'pk',
+    ).values_list('pk', 'username')[:limit].iterator(chunk_size=2000):
+        yield pk, reverse('posts:profile', args=[username]), None
+
+
+def group_entries(after, limit):
+    for pk, slug in Group.objects.filter(pk__gt=after).order_by(
+        'pk',
+    ).values_list('pk', 'slug')[:limit].iterator(chunk_size=2000):
+        yield pk, reverse('posts:group_list', args=[slug]), None
+
+
+SECTIONS = {
+    'posts': post_entries,
+    'profiles': profile_entries,
+    'groups': group_entries,
+}
+
+
+def chunk_file(section, number):
+    return f'sitemap-{section}-{number}.xml'
+
+
+def write_atomic(path, lines):
+    # Своё имя временного файла у каждой сборки: параллельные сборки
+    # не пишут в один файл, а читатель видит старый или новый целиком.
+    handle, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix='.tmp',
+    )
+    try:
+        with open(handle, 'w', encoding='utf-8') as output:
+            output.writelines(lines)
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def write_chunk(path, entries):
+    """Пишет файл раздела и возвращает (первый ключ, последний, число)."""
+    stats = {'first': None, 'last': None, 'count': 0}
+
+    def lines():
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        for pk, location, lastmod in entries:
+            if stats['first'] is None:
+                stats['first'] = pk
+            stats['last'] = pk
+            stats['count'] += 1
+            yield '<url><loc>{}</loc>{}</url>\n'.format(
+                escape(settings.SITEMAP_BASE_URL + location),
+                f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+                if lastmod else '',
+            )
+        yield '</urlset>\n'
+
+    write_atomic(path, lines())
+    return stats
+
+
+def first_grown_chunk(chunks):
+    """Номер первого файла, в диапазоне ключей которого прибавилось
+    опубликованных постов; если таких нет — число файлов.
+    """
+    if not chunks:
+        return 0
+    bounds = [0] + [chunk['last'] for chunk in chunks]
+    counts = Post.objects.published().aggregate(**{
+        f'chunk{number}': Count('pk', filter=Q(
+            pk__gt=bounds[number], pk__lte=bounds[number + 1],
+        ))
+        for number in range(len(chunks))
+    })
+    for number, chunk in enumerate(chunks):
+        if counts[f'chunk{number}'] > chunk['count']:
+            return number
+    return len(chunks)
+
+
+def build_section(root, section, chunks):
+    """Дописывает раздел: последний неполный файл и новые файлы."""
+    entries = SECTIONS[section]
+    if chunks and chunks[-1]['count'] < settings.SITEMAP_CHUNK_SIZE:
+        chunks.pop()
+    if section == 'posts':
+        del chunks[first_grown_chunk(chunks):]
+    while True:
+        after = chunks[-1]['last'] if chunks else 0
+        number = len(chunks) + 1
+        stats = write_chunk(
+            os.path.join(root, chunk_file(section, number)),
+            entries(after, settings.SITEMAP_CHUNK_SIZE),
+        )
+        if not stats['count'] and chunks:
+            os.remove(os.path.join(root, chunk_file(section, number)))
+            break
+        stats['lastmod'] = timezone.now().date().isoformat()
+        chunks.append(stats)
+        if stats['count'] < settings.SITEMAP_CHUNK_SIZE:
+            break
+    return chunks
+
+
+def build_sitemaps(root=None, full=False):
+    root = str(root or settings.SITEMAP_ROOT)
+    os.makedirs(root, exist_ok=True)
+    state_path = os.path.join(root, STATE_FILE)
+    state = {}
+    if not full and os.path.exists(state_path):
+        with open(state_path) as state_file:
+            state = json.load(state_file)
+    for section in SECTIONS:
+        state[section] = build_section(root, section, state.get(section, []))
+    write_atomic(os.path.join(root, INDEX_FILE), [
+        '<?xml version="1.0" encoding="UTF-8"?>\n',
+        '<sitemapindex '
+        'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n',
+        *(
+            '<sitemap><loc>{}</loc><lastmod>{}</lastmod></sitemap>\n'.format(
+                escape(settings.SITEMAP_BASE_URL + reverse(
+                    'posts:sitemap_section', args=[section, number],
+                )),
+                chunk['lastmod'],
+            )
+            for section, chunks in state.items()
+            for number, chunk in enumerate(chunks, start=1)
+        ),
+        '</sitemapindex>\n',
+    ])
+    write_atomic(state_path, [json.dumps(state)])
+    return state
+
+
+def serve(name):
+    path = os.path.join(str(settings.SITEMAP_ROOT), name)
+    try:
+        sitemap = open(path, 'rb')
+    except FileNotFoundError:
+        raise Http404('Такой части карты сайта нет.')
+    return FileResponse(sitemap, content_type='application/xml')
+
+
+def sitemap_index(request):
+    return serve(INDEX_FILE)
+
+
+def sitemap_section(request, section, number):
+    if section not in SECTIONS:
+        raise Http404('Неизвестный раздел карты сайта.')
+    return serve(chunk_file(section, number))
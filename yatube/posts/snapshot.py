@@ -0,0 +1,193 @@
+"""Статическая копия страниц, которые анонимы только читают.
+
+Страница ``/group/slug/`` сохраняется в ``group/slug/index.html``,
+а её N-я страница пагинации — в ``group/slug/page/N/index.html``.
+Веб-сервер отдаёт файл, если он есть, и иначе проксирует запрос
+в приложение, например для nginx::
+
+    set $snapshot $uri/index.html;
+    if ($arg_page) { set $snapshot $uri/page/$arg_page/index.html; }
+    try_files /snapshot$snapshot @yatube;
+
+Удалённые и снятые с публикации посты находятся сверкой номеров
+в ``posts/`` с опубликованными: их файлы удаляются, а списки
+перерисовываются целиком. Так же поступают с постами, сменившими
+группу или автора: состояние копии помнит, где пост был при прошлом
+запуске, а старый список иначе остался бы с ним. Правку текста через
+``QuerySet.update()`` без ``updated`` так не заметить — для неё есть
+``--full``.
+"""
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.conf import settings
+from django.db import connections
+from django.db.models import Count, Q
+from django.test import Client
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+
+_output = None
+
+
+def listing_urls(path, count):
+    pages = max(1, math.ceil(count / settings.FIRST_TEN_VALUE))
+    return [path] + [f'{path}?page={page}' for page in range(2, pages + 1)]
+
+
+def snapshot_post_ids(output):
+    """Номера постов, страницы которых уже лежат в копии."""
+    try:
+        names = os.listdir(os.path.join(output, 'posts'))
+    except FileNotFoundError:
+        return set()
+    return {int(name) for name in names if name.isdigit()}
+
+
+def stale_post_ids(output):
+    """Посты из копии, которых больше нет среди опубликованных."""
+    return snapshot_post_ids(output) - set(
+        Post.objects.published().values_list('pk', flat=True)
+    )
+
+
+def placements():
+    """Автор и группа каждого опубликованного поста для состояния копии."""
+    return {
+        str(pk): [author_id, group_id]
+        for pk, author_id, group_id in Post.objects.published().values_list(
+            'pk', 'author_id', 'group_id',
+        )
+    }
+
+
+def moved_post_ids(placed, current):
+    """Посты, у которых с прошлого запуска сменились группа или автор."""
+    return {
+        int(pk) for pk, place in placed.items()
+        if current.get(pk, place) != place
+    }
+
+
+def collect_urls(since=None, stale=()):
+    """Адреса страниц, которые нужно (пере)рисовать.
+
+    Без ``since`` — все страницы. Иначе только затронутые постами
+    и комментариями, изменёнными после ``since``; если в копии есть
+    устаревшие посты ``stale``, списки рисуются все: у удалённого
+    или перенесённого поста уже не узнать, в каких списках он лежит.
+    """
+    listings = since is None or bool(stale)
+    posts = Post.objects.published().order_by()
+    if since is not None:
+        posts = posts.filter(
+            Q(updated__gt=since)
+            | Q(pk__in=Comment.objects.filter(
+                created__gt=since,
+            ).values('post_id'))
+        )
+    changed = list(posts.values_list('pk', 'author_id', 'group_id'))
+    if not listings and not changed:
+        return []
+    urls = listing_urls(
+        reverse('posts:index'), Post.objects.published().count(),
+    )
+    authors = Post.objects.published().order_by()
+    groups = authors.filter(group__isnull=False)
+    if not listings:
+        authors = authors.filter(author_id__in={row[1] for row in changed})
+        groups = groups.filter(group_id__in={row[2] for row in changed})
+    for username, count in authors.values_list(
+        'author__username',
+    ).annotate(Count('pk')):
+        urls += listing_urls(
+            reverse('posts:profile', kwargs={'username': username}), count,
+        )
+    if listings:
+        for username in User.objects.exclude(
+            posts__is_published=True,
+        ).values_list('username', flat=True):
+            urls.append(
+                reverse('posts:profile', kwargs={'username': username})
+            )
+    for slug, count in groups.values_list('group__slug').annotate(
+        Count('pk'),
+    ):
+        urls += listing_urls(
+            reverse('posts:group_list', kwargs={'slug': slug}), count,
+        )
+    urls += [
+        reverse('posts:post_detail', kwargs={'post_id': post_id})
+        for post_id, _, _ in changed
+    ]
+    return urls
+
+
+def snapshot_path(output, url):
+    path, _, query = url.partition('?')
+    parts = [output, path.strip('/')]
+    if query:
+        parts += ['page', query.partition('=')[2]]
+    return os.path.join(*parts, 'index.html')
+
+
+def prune(output, urls):
+    """Удаляет файлы страниц, которых нет среди ``urls`` и постов.
+
+    Вызывается после полной перерисовки списков: так пропадают
+    страницы удалённых постов, лишние страницы пагинации и профили
+    удалённых пользователей. Возвращает число удалённых файлов.
+    """
+    keep = {snapshot_path(output, url) for url in urls}
+    keep.update(
+        snapshot_path(
+            output, reverse('posts:post_detail', kwargs={'post_id': pk}),
+        )
+        for pk in Post.objects.published().values_list('pk', flat=True)
+    )
+    removed = 0
+    for directory, _, files in os.walk(output, topdown=False):
+        path = os.path.join(directory, 'index.html')
+        if 'index.html' in files and path not in keep:
+            os.remove(path)
+            removed += 1
+        if directory != output and not os.listdir(directory):
+            os.rmdir(directory)
+    return removed
+
+
+def init_worker(output):
+    global _output
+    django.setup()
+    # Соединения родителя нельзя использовать в дочернем процессе.
+    connections.close_all()
+    _output = output
+
+
+def render_url(url):
+    response = Client().get(url)
+    if response.status_code != 200:
+        return url, response.status_code
+    path = snapshot_path(_output, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as snapshot:
+        snapshot.write(response.content)
+    os.replace(tmp_path, path)
+    return url, response.status_code
+
+
+def render_urls(urls, output, workers):
+    if workers <= 1:
+        init_worker(output)
+        return [render_url(url) for url in urls]
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(output,),
+    ) as executor:
+        return list(executor.map(render_url, urls, chunksize=16))
@@ -0,0 +1,102 @@
+import json
+
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Max, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from posts.models import Group, GroupAuthorStats, GroupStats, Post
+
+
+def refresh_top_authors(group_id):
+    top = GroupAuthorStats.objects.filter(
+        group_id=group_id,
+        posts_count__gt=0,
+    ).order_by('-posts_count', 'author_id').values_list(
+        'author__username', 'posts_count',
+    )[:settings.GROUP_TOP_AUTHORS]
+    GroupStats.objects.filter(group_id=group_id).update(
+        top_authors=json.dumps(
+            [
+                {'username': username, 'posts_count': posts_count}
+                for username, posts_count in top
+            ],
+            ensure_ascii=False,
+        ),
+    )
+
+
+def refresh_group_stats(group_ids=None):
+    """Полностью пересчитывает статистику групп по таблице постов."""
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    for group_id in groups.values_list('pk', flat=True):
+        with transaction.atomic():
+            posts = Post.objects.published().filter(
+                group_id=group_id,
+            ).order_by()
+            GroupAuthorStats.objects.filter(group_id=group_id).delete()
+            GroupAuthorStats.objects.bulk_create(
+                GroupAuthorStats(
+                    group_id=group_id,
+                    author_id=row['author_id'],
+                    posts_count=row['posts_count'],
+                )
+                for row in posts.values('author_id').annotate(
+                    posts_count=Count('pk'),
+                )
+            )
+            GroupStats.objects.update_or_create(
+                group_id=group_id,
+                defaults=posts.aggregate(
+                    posts_count=Count('pk'),
+                    last_activity=Max('pub_date'),
+                ),
+            )
+            refresh_top_authors(group_id)
+
+
+def apply_post(group_id, author_id, pub_date, delta):
+    """Учитывает появление (delta=1) или исчезновение (delta=-1) поста."""
+    if group_id is None:
+        return
+    with transaction.atomic():
+        group_stats = GroupStats.objects.filter(group_id=group_id)
+        if delta > 0:
+            pub_date = Value(pub_date, output_field=models.DateTimeField())
+            updated = group_stats.update(
+                posts_count=F('posts_count') + delta,
+                last_activity=Greatest(
+                    Coalesce('last_activity', pub_date),
+                    pub_date,
+                ),
+            )
+        else:
+            updated = group_stats.filter(posts_count__gt=0).update(
+                posts_count=F('posts_count') + delta,
+                last_activity=Post.objects.published().filter(
+                    group_id=group_id,
+                ).order_by().aggregate(Max('pub_date'))['pub_date__max'],
+            )
+        if not updated:
+            # Статистики ещё нет или она разошлась с данными.
+            refresh_group_stats([group_id])
+            return
+        author_stats = GroupAuthorStats.objects.filter(
+            group_id=group_id,
+            author_id=author_id,
+        )
+        if delta > 0:
+            if not author_stats.update(posts_count=F('posts_count') + delta):
+                GroupAuthorStats.objects.create(
+                    group_id=group_id,
+                    author_id=author_id,
+                    posts_count=delta,
+                )
+        else:
+            author_stats.filter(posts_count__gt=0).update(
+                posts_count=F('posts_count') + delta,
+            )
+            author_stats.filter(posts_count=0).delete()
+        refresh_top_authors(group_id)
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+TMP_DIR = 'tmp'
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Хранит каждый уникальный файл один раз под именем из его хеша.
+
+    Имя файла ``posts/ab/cd/<sha256>.jpg`` строится по содержимому,
+    поэтому повторная загрузка той же картинки не занимает места
+    и переиспользует уже созданные миниатюры.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # Имя определяется содержимым в _save, суффиксы не нужны.
+        return name
+
+    def blob_name(self, prefix, digest, ext):
+        return os.path.join(prefix, digest[:2], digest[2:4], digest + ext)
+
+    def _save(self, name, content):
+        prefix, filename = os.path.split(name)
+        ext = os.path.splitext(filename)[1].lower()
+        tmp_dir = self.path(TMP_DIR)
+        os.makedirs(tmp_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+        try:
+            digest = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as tmp:
+                if hasattr(content, 'seek'):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    tmp.write(chunk)
+            name = self.blob_name(prefix, digest.hexdigest(), ext)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                os.remove(tmp_path)
+                # Свежая дата изменения: сборщик мусора с --grace не удалит
+                # файл, на который ссылку ещё только собираются сохранить.
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                os.replace(tmp_path, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return name.replace('\\', '/')
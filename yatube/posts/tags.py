@@ -0,0 +1,101 @@
+"""Хештеги: обратный индекс тег → пост и счётчики постов у тегов."""
+from collections import defaultdict
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F
+
+from posts import autocomplete
+from posts.models import PostTag, Tag
+
+# Не больше стольких параметров в одном IN (предел SQLite — 999).
+IN_CHUNK = 500
+
+
+def chunked(items, size=IN_CHUNK):
+    items = iter(items)
+    while True:
+        chunk = list(islice(items, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def change_counts(deltas):
+    """Меняет posts_count: по одному UPDATE на каждое значение сдвига."""
+    by_delta = defaultdict(list)
+    for tag_id, delta in deltas.items():
+        if delta:
+            by_delta[delta].append(tag_id)
+    for delta, tag_ids in by_delta.items():
+        for chunk in chunked(tag_ids):
+            Tag.objects.filter(pk__in=chunk).update(
+                posts_count=F('posts_count') + delta,
+            )
+
+
+def fetch_tag_ids(names):
+    ids = {}
+    for chunk in chunked(names):
+        ids.update(
+            Tag.objects.filter(name__in=chunk).values_list('name', 'pk')
+        )
+    return ids
+
+
+def tag_ids_for(names):
+    """id тегов по именам; недостающие теги создаются."""
+    names = set(names)
+    ids = fetch_tag_ids(names)
+    missing = names - ids.keys()
+    if missing:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in missing], ignore_conflicts=True,
+        )
+        ids.update(fetch_tag_ids(missing))
+        autocomplete.add(
+            item for name in missing for item in autocomplete.tag_items(name)
+        )
+    return ids
+
+
+def add_links(rows):
+    """Привязывает теги к постам: rows — (id поста, имена, pub_date)."""
+    rows = [row for row in rows if row[1]]
+    if not rows:
+        return 0
+    ids = tag_ids_for(name for _, names, _ in rows for name in names)
+    links = [
+        PostTag(post_id=post_id, tag_id=ids[name], pub_date=pub_date)
+        for post_id, names, pub_date in rows
+        for name in names
+    ]
+    PostTag.objects.bulk_create(links, batch_size=IN_CHUNK)
+    deltas = defaultdict(int)
+    for link in links:
+        deltas[link.tag_id] += 1
+    change_counts(deltas)
+    return len(links)
+
+
+@transaction.atomic
+def sync_post_tags(post, names):
+    """Приводит теги поста к ``names``; у неопубликованного тегов нет."""
+    wanted = set(names) if post.is_published else set()
+    links = PostTag.objects.filter(post_id=post.pk)
+    current = dict(links.values_list('tag__name', 'tag_id'))
+    removed = [current[name] for name in current.keys() - wanted]
+    if removed:
+        links.filter(tag_id__in=removed).delete()
+        change_counts({tag_id: -1 for tag_id in removed})
+    if len(current) > len(removed):
+        links.exclude(pub_date=post.pub_date).update(pub_date=post.pub_date)
+    add_links([(post.pk, wanted - current.keys(), post.pub_date)])
+
+
+def untag_post(post_id):
+    change_counts({
+        tag_id: -1 for tag_id in PostTag.objects.filter(
+            post_id=post_id,
+        ).values_list('tag_id', flat=True)
+    })
@@ -0,0 +1,58 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Group, GroupStats, Post, User
+
+
+class PostAdminTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass",
+        )
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.admin, text=f"Пост {number}")
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.admin)
+
+    def test_changelist_uses_autocomplete(self):
+        """Группа в списке выбирается через автодополнение."""
+        response = self.client.get(reverse("admin:posts_post_changelist"))
+        self.assertContains(response, "admin-autocomplete")
+        self.assertNotContains(response, '<option value="{}">'.format(
+            self.group.pk,
+        ))
+
+    def test_move_to_group_action(self):
+        """Перенос в группу одним запросом обновляет и статистику."""
+        started = timezone.now()
+        response = self.client.post(
+            reverse("admin:posts_post_changelist"),
+            {
+                "action": "move_to_group",
+                "group_slug": self.group.slug,
+                "_selected_action": [post.pk for post in self.posts],
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Post.objects.filter(group=self.group).count(), 3)
+        self.assertEqual(
+            Post.objects.filter(updated__gte=started).count(), 3,
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 3,
+        )
@@ -0,0 +1,77 @@
+import os
+
+from django.db import transaction
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from .. import autocomplete
+from ..models import Group, Post, User
+
+
+class AutocompleteTests(IsolatedTestMixin, TransactionTestCase):
+    # Индекс меняется после коммита, поэтому транзакции должны коммититься.
+
+    def setUp(self):
+        super().setUp()
+        self.override(AUTOCOMPLETE_VERSION_FILE=os.path.join(
+            self.make_dir(), "autocomplete.version",
+        ))
+        User.objects.create_user(username="Leo")
+        User.objects.create_user(username="lena")
+        Group.objects.create(
+            title="Лепка", slug="lepka", description="Описание",
+        )
+        autocomplete.drop_index()
+        self.url = reverse("posts:autocomplete")
+
+    def search(self, prefix):
+        response = self.client.get(self.url, {"q": prefix})
+        return [item["label"] for item in response.json()["results"]]
+
+    def test_prefix_search_without_queries(self):
+        """Поиск по префиксу без учёта регистра идёт без запросов к базе."""
+        self.search("l")
+        with self.assertNumQueries(0):
+            labels = self.search("le")
+        self.assertEqual(labels, ["lena", "Leo", "Лепка"])
+        self.assertEqual(self.search("ЛЕП"), ["Лепка"])
+        self.assertEqual(self.search(""), [])
+
+    def test_new_objects_are_added_without_rebuild(self):
+        """Новые пользователи и теги попадают в индекс без пересборки."""
+        self.search("x")
+        User.objects.create_user(username="lex")
+        Post.objects.create(
+            author=User.objects.get(username="Leo"), text="#летний пост",
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(self.search("lex"), ["lex"])
+            self.assertEqual(self.search("лет"), ["#летний"])
+
+    def test_rename_rebuilds_index(self):
+        """Переименование пересобирает индекс."""
+        self.search("x")
+        user = User.objects.get(username="lena")
+        user.username = "olena"
+        user.save()
+        self.assertEqual(self.search("olen"), ["olena"])
+        self.assertEqual(self.search("lena"), [])
+
+    def test_rolled_back_tags_stay_out_of_index(self):
+        """Теги из откаченной транзакции в индекс не попадают."""
+        self.search("x")
+        author = User.objects.get(username="Leo")
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                Post.objects.create(author=author, text="#откат")
+                raise RuntimeError
+        self.assertEqual(self.search("отк"), [])
+
+    def test_changes_from_other_process_rebuild_index(self):
+        """Чужая версия в файле пересобирает индекс."""
+        self.search("x")
+        autocomplete.bump_version()
+        Group.objects.filter(slug="lepka").update(title="Лес")
+        self.assertEqual(self.search("лес"), ["Лес"])
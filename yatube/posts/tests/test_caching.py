@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from ..caching import get_following_ids, get_group_or_404, is_following
+from ..models import Follow, Group, User
+
+
+class CrossWorkerCacheTests(IsolatedTestMixin, TestCase):
+    """Изменения, сделанные одним воркером, видны остальным."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="following")
+        cls.user = User.objects.create_user(username="follower")
+
+    def worker(self, backend):
+        """Подменяет кеш posts.caching кешем другого «воркера»."""
+        return mock.patch("posts.caching.cache", backend)
+
+    def test_following_cache(self):
+        """Подписки читаются из общего кеша, (от)писка их сбрасывает."""
+        self.share_cache()
+        client = Client()
+        client.force_login(self.user)
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
+        client.get(reverse(
+            "posts:profile_follow",
+            kwargs={"username": self.author.username}))
+        with self.assertNumQueries(1):
+            self.assertTrue(is_following(self.user.pk, self.author.pk))
+        with self.assertNumQueries(0):
+            self.assertEqual(list(get_following_ids(self.user.pk)),
+                             [self.author.pk])
+        client.get(reverse(
+            "posts:profile_unfollow",
+            kwargs={"username": self.author.username}))
+        self.assertFalse(is_following(self.user.pk, self.author.pk))
+
+    def test_follow_is_seen_by_worker_with_process_cache(self):
+        """С кешем процесса подписки не кешируются и не устаревают."""
+        first = LocMemCache("first-worker", {})
+        second = LocMemCache("second-worker", {})
+        with self.worker(second):
+            self.assertFalse(is_following(self.user.pk, self.author.pk))
+        with self.worker(first):
+            Follow.objects.create(user=self.user, author=self.author)
+        with self.worker(second):
+            self.assertTrue(is_following(self.user.pk, self.author.pk))
+
+    def test_follow_is_seen_by_worker_with_shared_cache(self):
+        """Через общий кеш сброс подписок виден другому воркеру."""
+        self.share_cache()
+        location = self.make_dir()
+        first = FileBasedCache(location, {})
+        second = FileBasedCache(location, {})
+        with self.worker(second):
+            self.assertFalse(is_following(self.user.pk, self.author.pk))
+        with self.worker(first):
+            Follow.objects.create(user=self.user, author=self.author)
+        with self.worker(second):
+            self.assertTrue(is_following(self.user.pk, self.author.pk))
+
+    def test_group_rename_is_seen_by_worker_with_process_cache(self):
+        """С кешем процесса переименованная группа не устаревает."""
+        group = Group.objects.create(
+            title="Старое название", slug="group", description="Описание",
+        )
+        first = LocMemCache("first-worker", {})
+        second = LocMemCache("second-worker", {})
+        with self.worker(second):
+            get_group_or_404("group")
+        with self.worker(first):
+            group.title = "Новое название"
+            group.save()
+        with self.worker(second):
+            self.assertEqual(get_group_or_404("group").title, "Новое название")
@@ -0,0 +1,85 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Group, Post, User
+
+
+class FeedTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text="Пост в группе", group=cls.group,
+        )
+        Post.objects.create(author=cls.user, text="Пост без группы")
+
+    def read(self, url, **headers):
+        response = self.client.get(url, **headers)
+        self.assertTrue(response.streaming)
+        return response, b"".join(response.streaming_content).decode()
+
+    def test_feeds_content(self):
+        """Ленты отдают посты своей группы или автора."""
+        urls = {
+            reverse("posts:feed", args=["rss"]): 2,
+            reverse("posts:feed", args=["atom"]): 2,
+            reverse("posts:group_feed", args=[self.group.slug, "rss"]): 1,
+            reverse(
+                "posts:profile_feed", args=[self.user.username, "atom"],
+            ): 2,
+        }
+        for url, items in urls.items():
+            with self.subTest(url=url):
+                response, content = self.read(url)
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(
+                    content.count("<item>") + content.count("<entry>"), items,
+                )
+        self.assertEqual(
+            self.client.get(reverse("posts:feed", args=["xml"])).status_code,
+            404,
+        )
+
+    def test_feed_conditional_get_and_cache(self):
+        """Повтор с ETag получает 304, новый пост меняет ленту."""
+        self.share_cache()
+        url = reverse("posts:feed", args=["rss"])
+        response, content = self.read(url)
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.read(url)[1], content)
+        Post.objects.create(author=self.user, text="Свежий пост")
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 200)
+
+    def test_feed_depends_on_host_and_scheme(self):
+        """Ссылки в ленте и её ETag свои для каждого хоста и схемы."""
+        self.share_cache()
+        url = reverse("posts:feed", args=["rss"])
+        plain, _ = self.read(url)
+        other, other_content = self.read(url, HTTP_HOST="localhost")
+        secure, secure_content = self.read(url, secure=True)
+        self.assertEqual(
+            len({plain["ETag"], other["ETag"], secure["ETag"]}), 3,
+        )
+        self.assertIn("http://localhost/", other_content)
+        self.assertIn("https://testserver/", secure_content)
+        self.assertNotIn("http://testserver/", other_content)
+
+    def test_process_cache_disables_etag(self):
+        """С кешем процесса лента не кешируется и отдаётся без ETag."""
+        url = reverse("posts:feed", args=["rss"])
+        response, _ = self.read(url)
+        self.assertFalse(response.has_header("ETag"))
+        Post.objects.create(author=self.user, text="Свежий пост")
+        self.assertIn("Свежий пост", self.read(url)[1])
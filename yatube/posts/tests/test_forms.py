@@ -1,15 +1,20 @@
 import shutil
 import tempfile
 from http import HTTPStatus
+from io import BytesIO
+from unittest import mock
 
 from django.conf import settings
+from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import Client, TestCase, override_settings
 from django.urls import reverse
+from PIL import Image, PngImagePlugin
 
 from yatube.settings import USER_NAME
 
-from ..models import Comment, Group, Post, User
+from ..models import Comment, Group, ImageBlob, Post, User
+from ..uploads import normalize_image
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -126,6 +131,7 @@ class PostFormTests(TestCase):
                 response = self.client.get(url)
                 obj = response.context["page_obj"][0]
                 self.assertEqual(obj.image, self.post.image)
+                self.assertContains(response, 'class="card-img my-2"')
 
     def test_image_in_post_detail_page(self):
         """Картинка передается на страницу post_detail."""
@@ -138,7 +144,7 @@ class PostFormTests(TestCase):
     def test_image_in_page(self):
         """Проверяем что создается пост с картинкой"""
         posts_count = Post.objects.count()
-        form_data = {"image": "posts/small.gif", "text": "Введите текст"}
+        form_data = {"image": self.post.image.name, "text": "Введите текст"}
         response = self.authorized_client.post(
             reverse("posts:post_create"), data=form_data, follow=True
         )
@@ -161,3 +167,73 @@ class PostFormTests(TestCase):
         self.assertEqual(Comment.objects.count(), test_comment + 1)
         comment = Comment.objects.latest("id")
         self.assertEqual(comment.text, self.form_data["text"])
+
+    def test_same_image_is_stored_once(self):
+        """Одинаковые картинки хранятся одним файлом со счётчиком ссылок."""
+        uploaded = SimpleUploadedFile(
+            name="copy.gif", content=self.small_gif, content_type="image/gif"
+        )
+        response = self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Копия", "image": uploaded},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
+        copy = Post.objects.get(text="Копия")
+        self.assertEqual(copy.image.name, self.post.image.name)
+        blob = ImageBlob.objects.get(name=copy.image.name)
+        self.assertEqual(blob.refs, 2)
+        copy.delete()
+        blob.refresh_from_db()
+        self.assertEqual(blob.refs, 1)
+
+    def make_png(self, size, **params):
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, format="PNG", **params)
+        return SimpleUploadedFile(
+            name="big.png", content=buffer.getvalue(), content_type="image/png"
+        )
+
+    @override_settings(IMAGE_UPLOAD_MAX_BYTES=10)
+    def test_oversized_upload_is_rejected(self):
+        """Слишком большой файл не сохраняется, форма сообщает об ошибке."""
+        response = self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Большой файл", "image": self.make_png((10, 10))},
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn("image", response.context["form"].errors)
+        self.assertFalse(Post.objects.filter(text="Большой файл").exists())
+
+    @override_settings(IMAGE_MAX_PIXELS=99)
+    def test_too_many_pixels_is_rejected(self):
+        """Картинка сверх лимита пикселей отклоняется по заголовку."""
+        response = self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={"text": "Много пикселей", "image": self.make_png((10, 10))},
+        )
+        self.assertIn("image", response.context["form"].errors)
+
+    @override_settings(IMAGE_MAX_PIXELS=99, IMAGE_MAX_SIDE=5)
+    def test_pixels_are_checked_before_decoding(self):
+        """PNG сверх лимита пикселей отклоняется до декодирования."""
+        with mock.patch.object(PngImagePlugin.PngImageFile, "load") as load:
+            with self.assertRaises(ValidationError):
+                normalize_image(self.make_png((10, 10)))
+        load.assert_not_called()
+
+    @override_settings(IMAGE_MAX_SIDE=20)
+    def test_large_image_is_downscaled(self):
+        """Большая картинка уменьшается, метаданные удаляются."""
+        exif = Image.Exif()
+        exif[0x010E] = "secret"
+        self.authorized_client.post(
+            reverse("posts:post_create"),
+            data={
+                "text": "Уменьшенная",
+                "image": self.make_png((100, 50), exif=exif),
+            },
+        )
+        post = Post.objects.get(text="Уменьшенная")
+        with Image.open(post.image.path) as image:
+            self.assertEqual(image.size, (20, 10))
+            self.assertNotIn("exif", image.info)
@@ -31,3 +31,21 @@ class PostModelTest(TestCase):
         for value, expected in values:
             with self.subTest(value=value):
                 self.assertEqual(value, expected)
+
+    def test_post_text_is_prerendered(self):
+        """При сохранении пост получает готовый HTML и начало текста."""
+        post = Post.objects.create(
+            author=self.user,
+            text='<b>Первая</b>\nстрока\n\n' + 'слово ' * 40,
+        )
+        self.assertTrue(
+            post.text_html.startswith(
+                '<p>&lt;b&gt;Первая&lt;/b&gt;<br>строка</p>',
+            )
+        )
+        self.assertTrue(post.excerpt.endswith(' …'))
+        post.text = 'Новый текст'
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Новый текст</p>')
+        self.assertEqual(post.excerpt, 'Новый текст')
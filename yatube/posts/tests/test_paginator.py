@@ -0,0 +1,68 @@
+from unittest import mock
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Post, User
+from ..paginator import CachedCountPaginator, page_window
+
+
+class CachedCountPaginatorTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f"Пост {number}")
+            for number in range(25)
+        )
+
+    def test_count_is_cached_until_posts_change(self):
+        """COUNT(*) выполняется один раз до изменения постов."""
+        self.share_cache()
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 25)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), 2).count, 25,
+            )
+        Post.objects.create(author=self.user, text="Новый пост")
+        self.assertEqual(CachedCountPaginator(Post.objects.all(), 2).count, 26)
+
+    def test_process_cache_sees_posts_from_other_workers(self):
+        """Счёт в кеше процесса не хранится и не отстаёт от воркеров."""
+        first = LocMemCache("first-worker", {})
+        second = LocMemCache("second-worker", {})
+
+        def count(backend):
+            with mock.patch("posts.paginator.cache", backend):
+                with mock.patch("posts.caching.cache", backend):
+                    return CachedCountPaginator(Post.objects.all(), 2).count
+
+        self.assertEqual(count(second), 25)
+        with mock.patch("posts.caching.cache", first):
+            Post.objects.create(author=self.user, text="Новый пост")
+        self.assertEqual(count(second), 26)
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=10)
+    def test_exact_count_without_estimate(self):
+        """Без оценки СУБД число записей считается одним запросом."""
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                CachedCountPaginator(Post.objects.all(), 2).count, 25,
+            )
+
+    def test_page_window(self):
+        """Страница отдаёт окно номеров вокруг текущей."""
+        paginator = CachedCountPaginator(Post.objects.all(), 2)
+        windows = {
+            1: [1, 2, 3, 4],
+            7: [4, 5, 6, 7, 8, 9, 10],
+            13: [10, 11, 12, 13],
+        }
+        for number, expected in windows.items():
+            with self.subTest(number=number):
+                self.assertEqual(
+                    list(page_window(paginator.page(number))), expected,
+                )
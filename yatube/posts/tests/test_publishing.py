@@ -0,0 +1,115 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Group, GroupStats, Post, PostQuerySet, Tag, User
+from ..publishing import publish_due
+
+
+class PublishingTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create(self, **data):
+        data.update(text="Отложенный пост", group=self.group.pk)
+        return self.client.post(reverse("posts:post_create"), data=data)
+
+    def test_draft_is_hidden_from_listings(self):
+        """Черновик не виден в лентах и на странице поста."""
+        self.create(mode="draft")
+        post = Post.objects.get()
+        self.assertFalse(post.is_published)
+        self.assertIsNone(post.published_at)
+        self.assertEqual(GroupStats.objects.get().posts_count, 0)
+        response = Client().get(reverse("posts:index"))
+        self.assertEqual(len(response.context["page_obj"]), 0)
+        response = Client().get(
+            reverse("posts:post_detail", kwargs={"post_id": post.pk})
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(
+            reverse("posts:profile", kwargs={"username": "author"})
+        )
+        self.assertEqual(list(response.context["drafts"]), [post])
+
+    def test_schedule_requires_future_time(self):
+        """Время отложенной публикации должно быть в будущем."""
+        response = self.create(
+            mode="schedule",
+            published_at=(timezone.now() - timedelta(hours=1)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+        )
+        self.assertTrue(response.context["publish_form"].errors)
+        self.assertFalse(Post.objects.exists())
+
+    def test_worker_publishes_due_posts(self):
+        """Воркер публикует посты, срок которых наступил."""
+        publish_at = timezone.now() + timedelta(hours=1)
+        self.create(
+            mode="schedule",
+            published_at=publish_at.strftime("%Y-%m-%d %H:%M:%S"),
+        )
+        self.assertEqual(publish_due(), 0)
+        self.assertEqual(
+            Client().get(reverse("posts:index")).context["paginator"].count,
+            0,
+        )
+        cache.clear()
+
+        self.assertEqual(publish_due(publish_at + timedelta(minutes=1)), 1)
+        post = Post.objects.get()
+        self.assertTrue(post.is_published)
+        self.assertEqual(post.pub_date, post.published_at)
+        self.assertEqual(GroupStats.objects.get().posts_count, 1)
+        response = Client().get(reverse("posts:index"))
+        self.assertEqual(response.context["paginator"].count, 1)
+
+    def test_publish_command(self):
+        """Команда публикует накопившиеся посты."""
+        Post.objects.create(
+            author=self.user,
+            text="Пост",
+            is_published=False,
+            published_at=timezone.now() - timedelta(minutes=1),
+        )
+        stdout = StringIO()
+        call_command("publish_scheduled", stdout=stdout)
+        self.assertIn("1", stdout.getvalue())
+        self.assertTrue(Post.objects.get().is_published)
+
+    def test_stale_batch_is_not_linked_twice(self):
+        """Пачка, опубликованная другим воркером, не дублирует теги."""
+        post = Post.objects.create(
+            author=self.user,
+            text="Пост #тег",
+            is_published=False,
+            published_at=timezone.now() - timedelta(minutes=1),
+        )
+        self.assertEqual(publish_due(), 1)
+        stale = iter([Post.objects.filter(pk=post.pk)])
+        with mock.patch.object(
+            PostQuerySet, "due",
+            lambda queryset, now: next(stale, Post.objects.none()),
+        ):
+            self.assertEqual(publish_due(), 0)
+        self.assertEqual(Tag.objects.get(name="тег").posts_count, 1)
@@ -0,0 +1,83 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Post, PostRevision, User
+from ..revisions import revision_text
+
+
+class RevisionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+
+    def setUp(self):
+        self.post = Post.objects.create(
+            author=self.user, text="Первая строка\nВторая строка\n",
+        )
+        self.texts = [self.post.text]
+
+    def edit(self, count):
+        for number in range(count):
+            self.post.text = self.texts[-1] + f"Правка {number}\n"
+            self.post.save()
+            self.texts.append(self.post.text)
+
+    def test_edit_view_records_history(self):
+        """Правка поста сохраняет версию и показывает историю."""
+        client = Client()
+        client.force_login(self.user)
+        client.post(
+            reverse("posts:post_edit", kwargs={"post_id": self.post.pk}),
+            data={"text": "Первая строка\nНовая вторая строка"},
+        )
+        revisions = PostRevision.objects.filter(post=self.post)
+        self.assertEqual(revisions.count(), 2)
+        latest = revisions.get(number=2)
+        self.assertEqual(latest.editor, self.user)
+        self.assertFalse(latest.is_snapshot)
+        self.assertEqual(revision_text(self.post.pk, 1), self.texts[0])
+        self.assertEqual(
+            revision_text(self.post.pk, 2),
+            "Первая строка\nНовая вторая строка",
+        )
+
+    def test_unchanged_text_is_not_recorded(self):
+        """Сохранение без изменения текста версию не пишет."""
+        self.post.save()
+        self.assertFalse(PostRevision.objects.exists())
+
+    @override_settings(REVISION_SNAPSHOT_EVERY=3)
+    def test_periodic_snapshots(self):
+        """Каждая REVISION_SNAPSHOT_EVERY-я версия хранится целиком."""
+        self.edit(5)
+        snapshots = PostRevision.objects.filter(
+            is_snapshot=True,
+        ).values_list("number", flat=True)
+        self.assertEqual(sorted(snapshots), [1, 4])
+        for number, text in enumerate(self.texts, start=1):
+            with self.assertNumQueries(1):
+                self.assertEqual(revision_text(self.post.pk, number), text)
+
+    def test_compaction_keeps_one_revision_per_day(self):
+        """Сжатие оставляет от старых версий одну в день."""
+        self.edit(5)
+        old = timezone.now() - timedelta(days=200)
+        PostRevision.objects.filter(number__lte=3).update(created=old)
+        stdout = StringIO()
+        call_command("compact_revisions", stdout=stdout)
+        self.assertEqual(
+            list(PostRevision.objects.order_by("number").values_list(
+                "number", flat=True,
+            )),
+            [3, 4, 5, 6],
+        )
+        self.assertTrue(PostRevision.objects.get(number=3).is_snapshot)
+        for number in (3, 4, 5, 6):
+            self.assertEqual(
+                revision_text(self.post.pk, number), self.texts[number - 1],
+            )
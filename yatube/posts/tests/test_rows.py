@@ -0,0 +1,64 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Group, Post, User
+from ..rows import PostRow, feed, make_rows
+
+
+class FeedRowsTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Группа", slug="group", description="Описание",
+        )
+        cls.with_group = Post.objects.create(
+            author=cls.author, group=cls.group, text="Пост *группы*",
+        )
+        cls.without_group = Post.objects.create(
+            author=cls.author, text="Пост без группы",
+        )
+
+    def test_rows_share_related_objects(self):
+        """Строки ленты строятся одним запросом и делят авторов."""
+        with self.assertNumQueries(1):
+            rows = make_rows(feed(Post.objects.order_by("pk")))
+        self.assertEqual(
+            [row.pk for row in rows],
+            [self.with_group.pk, self.without_group.pk],
+        )
+        self.assertIs(rows[0].author, rows[1].author)
+        self.assertEqual(str(rows[0].author), "author")
+        self.assertEqual(rows[0].group.slug, "group")
+        self.assertIsNone(rows[1].group)
+        self.assertEqual(rows[0].text_html, self.with_group.text_html)
+        self.assertFalse(rows[0].image)
+        self.assertFalse(hasattr(rows[0], "__dict__"))
+
+    def test_feeds_render_rows(self):
+        """Ленты рисуют строки PostRow."""
+        urls = (
+            reverse("posts:index"),
+            reverse("posts:group_list", kwargs={"slug": self.group.slug}),
+            reverse("posts:profile", kwargs={"username": "author"}),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                post = response.context["page_obj"][0]
+                self.assertIsInstance(post, PostRow)
+                self.assertContains(response, self.with_group.text_html)
+                self.assertContains(
+                    response, reverse("posts:profile", args=["author"]),
+                )
+
+    def test_bench_command_reports_savings(self):
+        """Команда замера сообщает об экономии."""
+        out = StringIO()
+        call_command("bench_feed", repeat=1, stdout=out)
+        self.assertIn("Экономия", out.getvalue())
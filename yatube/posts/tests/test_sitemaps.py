@@ -0,0 +1,100 @@
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+from core.testing import IsolatedTestMixin
+
+from .. import sitemaps
+from ..models import Group, Post, User
+from ..publishing import publish_due
+
+
+class SitemapTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+        cls.posts = [
+            Post.objects.create(author=cls.user, text=f"Пост {number}")
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        super().setUp()
+        self.root = self.make_dir(dir=settings.BASE_DIR)
+        self.override(SITEMAP_CHUNK_SIZE=2, SITEMAP_ROOT=self.root)
+
+    def read(self, name):
+        with open(os.path.join(self.root, name), encoding="utf-8") as file:
+            return file.read()
+
+    def test_posts_are_split_into_chunks(self):
+        """Посты делятся на части по SITEMAP_CHUNK_SIZE."""
+        state = sitemaps.build_sitemaps(self.root)
+        self.assertEqual(
+            [chunk["count"] for chunk in state["posts"]], [2, 1],
+        )
+        index = self.read(sitemaps.INDEX_FILE)
+        self.assertIn("/sitemap-posts-2.xml", index)
+        self.assertIn(f"/posts/{self.posts[2].pk}/", self.read(
+            "sitemap-posts-2.xml"
+        ))
+        self.assertIn("/group/test-slug/", self.read("sitemap-groups-1.xml"))
+
+    def test_incremental_build_keeps_full_chunks(self):
+        """Повторная сборка не трогает заполненные части."""
+        sitemaps.build_sitemaps(self.root)
+        first_chunk = os.path.join(self.root, "sitemap-posts-1.xml")
+        os.utime(first_chunk, (0, 0))
+        new_post = Post.objects.create(author=self.user, text="Новый пост")
+        state = sitemaps.build_sitemaps(self.root)
+        self.assertEqual(
+            [chunk["count"] for chunk in state["posts"]], [2, 2],
+        )
+        self.assertEqual(os.path.getmtime(first_chunk), 0)
+        self.assertIn(
+            f"/posts/{new_post.pk}/", self.read("sitemap-posts-2.xml"),
+        )
+
+    def test_scheduled_post_is_added_to_full_chunk(self):
+        """Отложенный пост со старым ключом попадает в карту сайта."""
+        scheduled = self.posts[0]
+        Post.objects.filter(pk=scheduled.pk).update(
+            is_published=False,
+            published_at=timezone.now() - timedelta(hours=1),
+        )
+        state = sitemaps.build_sitemaps(self.root)
+        self.assertEqual([chunk["count"] for chunk in state["posts"]], [2])
+        publish_due()
+        state = sitemaps.build_sitemaps(self.root)
+        self.assertEqual(
+            [chunk["count"] for chunk in state["posts"]], [2, 1],
+        )
+        self.assertIn(
+            f"/posts/{scheduled.pk}/", self.read("sitemap-posts-1.xml"),
+        )
+
+    def test_views_serve_files(self):
+        """Готовые файлы отдаются, до сборки и для чужих имён — 404."""
+        self.assertEqual(self.client.get("/sitemap.xml").status_code, 404)
+        sitemaps.build_sitemaps()
+        response = self.client.get("/sitemap.xml")
+        self.assertEqual(response.status_code, 200)
+        content = b"".join(response.streaming_content)
+        self.assertIn(b"/sitemap-profiles-1.xml", content)
+        response = self.client.get("/sitemap-posts-1.xml")
+        self.assertEqual(response.status_code, 200)
+        response.close()
+        self.assertEqual(
+            self.client.get("/sitemap-posts-9.xml").status_code, 404,
+        )
+        self.assertEqual(
+            self.client.get("/sitemap-unknown-1.xml").status_code, 404,
+        )
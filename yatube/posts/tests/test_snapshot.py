@@ -0,0 +1,102 @@
+import os
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Comment, Group, Post, User
+
+
+class SnapshotTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+        cls.post = Post.objects.create(
+            author=cls.user, text="Тестовый пост", group=cls.group,
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.output = self.make_dir(dir=settings.BASE_DIR)
+
+    def build(self):
+        stdout = StringIO()
+        call_command(
+            "build_snapshot", output=self.output, workers=1, stdout=stdout,
+        )
+        return stdout.getvalue()
+
+    def test_full_snapshot(self):
+        """Сохраняются главная, группа, профиль и пост."""
+        self.build()
+        for path in (
+            "index.html",
+            "group/test-slug/index.html",
+            "profile/author/index.html",
+            f"posts/{self.post.pk}/index.html",
+        ):
+            with self.subTest(path=path):
+                self.assertTrue(
+                    os.path.exists(os.path.join(self.output, path)),
+                )
+
+    def test_incremental_snapshot(self):
+        """Повторный запуск рисует только затронутые страницы."""
+        self.build()
+        self.assertIn("Сохранено страниц: 0", self.build())
+        Comment.objects.create(post=self.post, author=self.user, text="Да")
+        self.assertIn("Сохранено страниц: 4", self.build())
+
+    def test_deleted_post_is_removed(self):
+        """Страница удалённого поста пропадает при повторном запуске."""
+        other = Post.objects.create(author=self.user, text="Второй пост")
+        self.build()
+        path = os.path.join(self.output, f"posts/{other.pk}/index.html")
+        self.assertTrue(os.path.exists(path))
+        other.delete()
+        output = self.build()
+        self.assertFalse(os.path.exists(path))
+        self.assertIn("Удалено страниц: 1", output)
+        self.assertTrue(
+            os.path.exists(os.path.join(self.output, "index.html")),
+        )
+
+    def test_unpublished_by_update_is_removed(self):
+        """Снятие с публикации через update() тоже замечается."""
+        self.build()
+        Post.objects.filter(pk=self.post.pk).update(is_published=False)
+        self.build()
+        self.assertFalse(os.path.exists(
+            os.path.join(self.output, f"posts/{self.post.pk}/index.html"),
+        ))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.output, "group/test-slug/index.html"),
+        ))
+
+    def test_moved_post_leaves_old_group(self):
+        """Пост, перенесённый в другую группу, пропадает из старой."""
+        other = Group.objects.create(
+            title="Другая группа", slug="other-slug", description="Другая",
+        )
+        self.build()
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = other
+        post.save()
+        self.build()
+        self.assertFalse(os.path.exists(
+            os.path.join(self.output, "group/test-slug/index.html"),
+        ))
+        with open(
+            os.path.join(self.output, "group/other-slug/index.html"),
+            encoding="utf-8",
+        ) as page:
+            self.assertIn("Тестовый пост", page.read())
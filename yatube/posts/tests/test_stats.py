@@ -0,0 +1,72 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Group, GroupAuthorStats, GroupStats, Post, User
+
+
+class GroupStatsTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username="author")
+        cls.group = Group.objects.create(
+            title="Тестовая группа",
+            slug="test-slug",
+            description="Тестовое описание",
+        )
+        cls.other_group = Group.objects.create(
+            title="Другая группа",
+            slug="other-slug",
+            description="Тестовое описание",
+        )
+
+    def test_stats_follow_posts(self):
+        """Статистика группы обновляется при создании и удалении поста."""
+        post = Post.objects.create(
+            author=self.author, text="Пост", group=self.group,
+        )
+        stats = GroupStats.objects.get(group=self.group)
+        self.assertEqual(stats.posts_count, 1)
+        self.assertEqual(stats.last_activity, post.pub_date)
+        self.assertEqual(
+            stats.top_authors_list,
+            [{"username": self.author.username, "posts_count": 1}],
+        )
+        post.delete()
+        stats.refresh_from_db()
+        self.assertEqual(stats.posts_count, 0)
+        self.assertIsNone(stats.last_activity)
+        self.assertFalse(GroupAuthorStats.objects.exists())
+
+    def test_stats_follow_group_change(self):
+        """Перенос поста в другую группу переносит и статистику."""
+        Post.objects.create(author=self.author, text="Пост", group=self.group)
+        post = Post.objects.get(group=self.group)
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(
+            GroupStats.objects.get(group=self.group).posts_count, 0,
+        )
+        self.assertEqual(
+            GroupStats.objects.get(group=self.other_group).posts_count, 1,
+        )
+
+    def test_group_index_uses_stats(self):
+        """Каталог групп строится по статистике."""
+        Post.objects.create(author=self.author, text="Пост", group=self.group)
+        response = Client().get(reverse("posts:group_index"))
+        stats = {
+            item.group: item.posts_count
+            for item in response.context["page_obj"]
+        }
+        self.assertEqual(stats, {self.group: 1, self.other_group: 0})
+
+    def test_group_resolver_is_cached(self):
+        """Повторное открытие группы не запрашивает её из базы."""
+        self.share_cache()
+        url = reverse("posts:group_list", kwargs={"slug": self.group.slug})
+        Client().get(url)
+        with self.assertNumQueries(0):
+            Client().get(url)
@@ -0,0 +1,28 @@
+import os
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from core.testing import IsolatedTestMixin
+
+from ..storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTests(IsolatedTestMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.storage = ContentAddressedStorage(location=self.make_dir())
+
+    def test_same_content_is_stored_once(self):
+        """Одинаковое содержимое сохраняется в один файл."""
+        first = self.storage.save("posts/first.jpg", ContentFile(b"image"))
+        second = self.storage.save("posts/second.JPG", ContentFile(b"image"))
+        self.assertEqual(first, second)
+        self.assertTrue(first.endswith(".jpg"))
+
+    def test_repeated_upload_refreshes_mtime(self):
+        """Повторная загрузка обновляет дату изменения файла."""
+        name = self.storage.save("posts/image.jpg", ContentFile(b"image"))
+        os.utime(self.storage.path(name), (0, 0))
+        self.storage.save("posts/image.jpg", ContentFile(b"image"))
+        self.assertGreater(os.path.getmtime(self.storage.path(name)), 0)
@@ -0,0 +1,47 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from core.testing import IsolatedTestMixin
+
+from ..models import Comment, Follow, FollowSuggestion, Post, User
+
+
+class FollowSuggestionTests(IsolatedTestMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username="reader")
+        cls.friend = User.objects.create_user(username="friend")
+        cls.writer = User.objects.create_user(username="writer")
+        cls.commenter = User.objects.create_user(username="commenter")
+        Follow.objects.create(user=cls.reader, author=cls.friend)
+        Follow.objects.create(user=cls.friend, author=cls.writer)
+        post = Post.objects.create(author=cls.writer, text="Пост")
+        Comment.objects.create(post=post, author=cls.reader, text="Раз")
+        Comment.objects.create(post=post, author=cls.commenter, text="Два")
+
+    def setUp(self):
+        super().setUp()
+        call_command("build_follow_suggestions", stdout=StringIO())
+
+    def test_suggestions_from_graph(self):
+        """Рекомендуются друзья друзей и соавторы комментариев."""
+        suggested = list(
+            FollowSuggestion.objects.filter(user=self.reader).values_list(
+                "suggested__username", flat=True,
+            )
+        )
+        self.assertEqual(suggested, ["writer", "commenter"])
+
+    def test_profile_shows_suggestions(self):
+        """Профиль показывает рекомендации, кроме уже подписанных."""
+        client = Client()
+        client.force_login(self.reader)
+        Follow.objects.create(user=self.reader, author=self.commenter)
+        response = client.get(
+            reverse("posts:profile", kwargs={"username": self.friend})
+        )
+        self.assertEqual(response.context["suggestions"], [self.writer])
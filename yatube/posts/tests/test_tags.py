@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post, PostTag, Tag, User
+from ..rendering import parse_tags
+
+
+class TagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="author")
+
+    def counts(self):
+        return dict(Tag.objects.values_list("name", "posts_count"))
+
+    def test_parse_tags(self):
+        """Теги разбираются без учёта регистра и без повторов."""
+        self.assertEqual(
+            parse_tags("#Django и #питон, не тег: a#b, &#39; #django"),
+            ["django", "питон"],
+        )
+
+    def test_counts_follow_edits_and_deletes(self):
+        """Счётчики тегов следуют за правками и удалением."""
+        post = Post.objects.create(author=self.user, text="#one #two")
+        Post.objects.create(author=self.user, text="#two")
+        self.assertEqual(self.counts(), {"one": 1, "two": 2})
+        self.assertIn(reverse("posts:tag_posts", args=["one"]), post.text_html)
+
+        post.text = "#two #three"
+        post.save()
+        self.assertEqual(self.counts(), {"one": 0, "two": 2, "three": 1})
+
+        post.delete()
+        self.assertEqual(self.counts(), {"one": 0, "two": 1, "three": 0})
+
+    def test_drafts_are_not_tagged(self):
+        """Черновики тегов не получают."""
+        post = Post.objects.create(
+            author=self.user, text="#draft", is_published=False,
+        )
+        self.assertFalse(PostTag.objects.filter(post=post).exists())
+
+    def test_tag_feed_uses_cursor(self):
+        """Лента тега листается курсором."""
+        posts = [
+            Post.objects.create(author=self.user, text=f"#feed пост {number}")
+            for number in range(12)
+        ]
+        url = reverse("posts:tag_posts", args=["feed"])
+        response = self.client.get(url)
+        self.assertEqual(response.context["posts"], posts[:-11:-1])
+        cursor = response.context["next_cursor"]
+        self.assertIsNotNone(cursor)
+        response = self.client.get(url, {"cursor": cursor})
+        self.assertEqual(response.context["posts"], [posts[1], posts[0]])
+        self.assertIsNone(response.context["next_cursor"])
+        self.assertEqual(self.client.get(url + "?cursor=bad").status_code, 200)
+
+    def test_retag_command(self):
+        """Команда пересчитывает теги после правок в обход модели."""
+        post = Post.objects.create(author=self.user, text="#old")
+        Post.objects.filter(pk=post.pk).update(text="#new #fresh")
+        call_command("retag_posts", stdout=StringIO())
+        self.assertEqual(self.counts(), {"new": 1, "fresh": 1})
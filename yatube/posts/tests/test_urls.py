@@ -24,12 +24,14 @@ class PostURLTests(TestCase):
         )
         cls.templates = [
             "/",
+            "/group/",
             f"/group/{cls.group.slug}/",
             f"/profile/{cls.user}/",
             f"/posts/{cls.post.id}/",
         ]
         cls.templates_url_names = {
             "/": "posts/index.html",
+            "/group/": "posts/group_index.html",
             f"/group/{cls.group.slug}/": "posts/group_list.html",
             f"/profile/{cls.user.username}/": "posts/profile.html",
             f"/posts/{cls.post.id}/": "posts/post_detail.html",
@@ -1,10 +1,17 @@
+import tempfile
+import warnings
+
 from django import forms
 from django.core.cache import cache
-from django.test import Client, TestCase
+from django.core.cache.backends.base import CacheKeyWarning
+from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 
+from core import ratelimit
+from core.checks import check_ratelimit_cache
 from yatube.settings import FIRST_TEN_VALUE
 
+from ..caching import group_cache_key
 from ..models import Comment, Follow, Group, Post, User
 
 
@@ -57,7 +64,10 @@ class PostPagesTests(TestCase):
         """Список постов в шаблоне index равен 10."""
         response = self.client.get(reverse("posts:index"))
         expected = list(Post.objects.all()[:FIRST_TEN_VALUE])
-        self.assertEqual(list(response.context["page_obj"]), expected)
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            [post.pk for post in expected],
+        )
 
     def test_group_list_show_correct_context(self):
         """Список постов в шаблоне group_list равен 10."""
@@ -67,7 +77,10 @@ class PostPagesTests(TestCase):
         expected = list(
             Post.objects.filter(group_id=self.group.id)[:FIRST_TEN_VALUE],
         )
-        self.assertEqual(list(response.context["page_obj"]), expected)
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            [post.pk for post in expected],
+        )
 
     def test_profile_show_correct_context(self):
         """Список постов в шаблоне profile равен 10."""
@@ -77,7 +90,10 @@ class PostPagesTests(TestCase):
         expected = list(
             Post.objects.filter(author_id=self.user.id)[:FIRST_TEN_VALUE],
         )
-        self.assertEqual(list(response.context["page_obj"]), expected)
+        self.assertEqual(
+            [post.pk for post in response.context["page_obj"]],
+            [post.pk for post in expected],
+        )
 
     def test_post_detail_show_correct_context(self):
         """Шаблон post_detail сформирован с правильно."""
@@ -131,7 +147,7 @@ class PostPagesTests(TestCase):
             with self.subTest(value=value):
                 response = self.authorized_client.get(value)
                 form_field = response.context["page_obj"]
-                self.assertIn(expected, form_field)
+                self.assertIn(expected.pk, [post.pk for post in form_field])
 
     def test_check_group_not_in_mistake_group_list_page(self):
         """Проверяем что этот пост не попал не в ту группу."""
@@ -143,8 +159,9 @@ class PostPagesTests(TestCase):
         for value, expected in form_fields.items():
             with self.subTest(value=value):
                 response = self.authorized_client.get(value)
-                form_field = response.context["page_obj"]
-                self.assertNotIn(expected, form_field)
+                pks = [post.pk for post in response.context["page_obj"]]
+                for post in expected:
+                    self.assertNotIn(post.pk, pks)
 
     def test_comment_correct_context(self):
         """Форма Комментария создает запись в Post."""
@@ -163,6 +180,40 @@ class PostPagesTests(TestCase):
         )
         self.assertEqual(Comment.objects.count(), comments_count + 1)
 
+    @override_settings(
+        RATELIMITS={"add_comment": {"rate": "1/m", "key": "user"}},
+    )
+    def test_comment_rate_limit(self):
+        """Частые комментарии получают 429 и не попадают в базу."""
+        url = reverse("posts:add_comment", kwargs={"post_id": self.post.id})
+        self.authorized_client.post(url, data={"text": "Первый"})
+        response = self.authorized_client.post(url, data={"text": "Второй"})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn("Retry-After", response)
+        self.assertFalse(Comment.objects.filter(text="Второй").exists())
+
+    def test_rate_limit_requires_shared_cache(self):
+        """Кеш лимитов внутри процесса ломает проверку --deploy."""
+        errors = check_ratelimit_cache(None)
+        self.assertEqual([error.id for error in errors], ["core.E001"])
+        with override_settings(CACHES={"default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": tempfile.gettempdir(),
+        }}):
+            self.assertEqual(check_ratelimit_cache(None), [])
+
+    @override_settings(
+        RATELIMITS={"add_comment": {"rate": "5/m", "key": "user"}},
+    )
+    def test_rate_limit_warns_about_local_cache_once(self):
+        """Предупреждение о кеше процесса пишется в лог один раз."""
+        ratelimit._warned.clear()
+        url = reverse("posts:add_comment", kwargs={"post_id": self.post.id})
+        with self.assertLogs("core.ratelimit", "WARNING") as logs:
+            self.authorized_client.post(url, data={"text": "Первый"})
+            self.authorized_client.post(url, data={"text": "Второй"})
+        self.assertEqual(len(logs.output), 1)
+
     def test_check_cache(self):
         """Проверка кеша."""
         response = self.client.get(reverse("posts:index"))
@@ -185,13 +236,19 @@ class PostPagesTests(TestCase):
         response_2 = self.authorized_client.get(reverse("posts:follow_index"))
         self.assertEqual(len(response_2.context["page_obj"]), 1)
         # проверка подписки у юзера-фоловера
-        self.assertIn(self.post, response_2.context["page_obj"])
+        self.assertIn(
+            self.post.pk,
+            [post.pk for post in response_2.context["page_obj"]],
+        )
 
         # Проверка что пост не появился в избранных у юзера-обычного
         outsider = User.objects.create(username="NoName")
         self.authorized_client.force_login(outsider)
         response_2 = self.authorized_client.get(reverse("posts:follow_index"))
-        self.assertNotIn(self.post, response_2.context["page_obj"])
+        self.assertNotIn(
+            self.post.pk,
+            [post.pk for post in response_2.context["page_obj"]],
+        )
 
         # Проверка отписки от автора поста
         Follow.objects.all().delete()
@@ -228,3 +285,29 @@ class PostPagesTests(TestCase):
                 author=self.author
             ).exists()
         )
+
+    def test_group_cache_key_is_valid_for_memcached(self):
+        """Ключ группы с кириллицей в слаге годится для memcached."""
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", CacheKeyWarning)
+            cache.set(group_cache_key("группа"), 1)
+        self.assertTrue(group_cache_key("группа").isascii())
+        self.assertNotEqual(
+            group_cache_key("группа"), group_cache_key("группа-2"),
+        )
+
+    def test_post_detail_batches_related_rows(self):
+        """Авторы комментариев загружаются одним запросом."""
+        url = reverse("posts:post_detail", kwargs={"post_id": self.post.id})
+        Comment.objects.create(post=self.post, author=self.author, text="1")
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        for number in range(3):
+            Comment.objects.create(
+                post=self.post,
+                author=User.objects.create_user(username=f"reader{number}"),
+                text="Ещё комментарий",
+            )
+        with self.assertNumQueries(5):
+            response = self.client.get(url)
+        self.assertEqual(len(response.context["comments"]), 4)
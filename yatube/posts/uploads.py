@@ -0,0 +1,111 @@
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import (
+    SkipFile,
+    TemporaryFileUploadHandler,
+)
+from django.template.defaultfilters import filesizeformat
+
+# Ключи Image.info, которые не должны попасть на сайт.
+METADATA_KEYS = ('exif', 'xmp', 'XML:com.adobe.xmp', 'comment', 'photoshop')
+
+SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'WEBP': {'quality': 85},
+}
+
+
+class BoundedFileUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузки сразу на диск и обрывает слишком большие файлы."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+
+    def receive_data_chunk(self, raw_data, start):
+        self.received += len(raw_data)
+        if self.received > settings.IMAGE_UPLOAD_MAX_BYTES:
+            rejected = getattr(self.request, 'rejected_uploads', [])
+            rejected.append(self.field_name)
+            self.request.rejected_uploads = rejected
+            raise SkipFile()
+        super().receive_data_chunk(raw_data, start)
+
+
+def reject_oversized_uploads(request, form):
+    """Добавляет в форму ошибки для файлов, отброшенных при загрузке."""
+    if not form.is_bound:
+        return
+    for field_name in getattr(request, 'rejected_uploads', ()):
+        form.add_error(
+            field_name,
+            'Файл больше {}.'.format(
+                filesizeformat(settings.IMAGE_UPLOAD_MAX_BYTES),
+            ),
+        )
+
+
+def check_pixels(image):
+    """Image.size берётся из заголовка: пиксели ещё не декодированы."""
+    width, height = image.size
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise ValidationError(
+            f'Картинка {width}×{height} слишком велика.'
+        )
+
+
+def check_image(uploaded):
+    """Проверяет формат и размеры по заголовку, не декодируя картинку."""
+    image = uploaded.image
+    if image.format not in settings.IMAGE_FORMATS:
+        raise ValidationError(
+            'Поддерживаются только форматы: {}.'.format(
+                ', '.join(settings.IMAGE_FORMATS),
+            )
+        )
+    check_pixels(image)
+
+
+def normalize_image(uploaded):
+    """Удаляет метаданные и уменьшает слишком большие картинки.
+
+    Размеры сверяются с IMAGE_MAX_PIXELS по заголовку до декодирования
+    в любом формате. JPEG к тому же уменьшается ещё в декодере (draft);
+    PNG и WebP так не умеют и декодируются целиком, поэтому для них
+    предел пикселей — единственная защита памяти.
+    """
+    # Pillow нужен только здесь: не грузим его при старте воркера.
+    from PIL import Image, ImageOps
+
+    max_side = settings.IMAGE_MAX_SIDE
+    uploaded.seek(0)
+    with Image.open(uploaded) as image:
+        check_pixels(image)
+        oversized = max(image.size) > max_side
+        has_metadata = any(key in image.info for key in METADATA_KEYS)
+        if not (oversized or has_metadata):
+            uploaded.seek(0)
+            return uploaded
+        if getattr(image, 'is_animated', False):
+            # Кадры анимации не пересобираем, размеры уже проверены.
+            uploaded.seek(0)
+            return uploaded
+        image_format = image.format
+        image.draft(image.mode, (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((max_side, max_side))
+        for key in METADATA_KEYS:
+            image.info.pop(key, None)
+        normalized = TemporaryUploadedFile(
+            uploaded.name, uploaded.content_type, 0, None,
+        )
+        image.save(
+            normalized,
+            format=image_format,
+            **SAVE_OPTIONS.get(image_format, {}),
+        )
+    normalized.size = normalized.tell()
+    normalized.seek(0)
+    return normalized
@@ -1,13 +1,39 @@
 from django.urls import path
 
-from . import views
+from . import autocomplete, feeds, sitemaps, views
 
 app_name = 'posts'
 
 urlpatterns = [
     path('', views.index, name='index'),
+    path('feed/<str:kind>/', feeds.feed, name='feed'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap_index'),
+    path(
+        'sitemap-<slug:section>-<int:number>.xml',
+        sitemaps.sitemap_section,
+        name='sitemap_section',
+    ),
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path(
+        'group/<slug:value>/feed/<str:kind>/',
+        feeds.feed,
+        {'scope': 'group'},
+        name='group_feed',
+    ),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
+    path(
+        'autocomplete/',
+        autocomplete.autocomplete,
+        name='autocomplete',
+    ),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:value>/feed/<str:kind>/',
+        feeds.feed,
+        {'scope': 'profile'},
+        name='profile_feed',
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
@@ -1,15 +1,33 @@
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.views.decorators.cache import cache_page
 
-from posts.forms import CommentForm, PostForm
-from posts.models import Comment, Follow, Group, Post, User
-from yatube.settings import FIRST_TEN_VALUE
-
-
-def get_page_context(all_posts, request):
-    paginator = Paginator(all_posts, FIRST_TEN_VALUE)
+from core.loaders import get_identity_map
+from core.middleware import compress_page
+from core.ratelimit import ratelimit
+from posts.caching import get_following_ids, get_group_or_404, is_following
+from posts.forms import CommentForm, PostForm, PublishForm
+from posts.models import (
+    Comment,
+    Follow,
+    GroupStats,
+    Post,
+    PostTag,
+    Tag,
+    User,
+)
+from posts.paginator import CachedCountPaginator, cursor_page
+from posts.rows import feed, make_rows
+from posts.suggestions import get_suggestions
+from posts.uploads import reject_oversized_uploads
+
+
+def get_page_context(all_posts, request, row_factory=None):
+    paginator = CachedCountPaginator(
+        all_posts, settings.FIRST_TEN_VALUE, make_rows=row_factory,
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return {
@@ -20,44 +38,87 @@ def get_page_context(all_posts, request):
 
 
 @cache_page(20, cache='default', key_prefix='index_page')
+@compress_page
 def index(request):
     context = get_page_context(
-        Post.objects.select_related('author', 'group').all(),
-        request,
+        feed(Post.objects.published()), request, make_rows,
     )
     return render(request, 'posts/index.html', context)
 
 
+def group_index(request):
+    context = get_page_context(
+        GroupStats.objects.select_related('group'),
+        request,
+    )
+    return render(request, 'posts/group_index.html', context)
+
+
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
+    group = get_group_or_404(slug)
     context = {
         'group': group,
     }
-    context.update(get_page_context(group.posts.all(), request))
+    context.update(
+        get_page_context(
+            feed(Post.objects.published().filter(group_id=group.pk)),
+            request,
+            make_rows,
+        )
+    )
     return render(request, 'posts/group_list.html', context)
 
 
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    links, next_cursor = cursor_page(
+        PostTag.objects.filter(tag=tag).select_related(
+            'post__author', 'post__group',
+        ),
+        request.GET.get('cursor'),
+        settings.FIRST_TEN_VALUE,
+        pk_field='post_id',
+    )
+    context = {
+        'tag': tag,
+        'posts': [link.post for link in links],
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'posts/tag_posts.html', context)
+
+
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     following = (
         request.user.is_authenticated
-        and Follow.objects.filter(
-            user=request.user,
-            author=author,
-        ).exists()
+        and is_following(request.user.pk, author.pk)
     )
     context = {
         'author': author,
         "following": following,
+        'following_count': len(get_following_ids(author.pk)),
     }
-    context.update(get_page_context(author.posts.all(), request))
+    if request.user.is_authenticated:
+        context['suggestions'] = get_suggestions(request.user, author.pk)
+    if request.user == author:
+        context['drafts'] = author.posts.filter(
+            is_published=False,
+        ).order_by('published_at')
+    context.update(
+        get_page_context(feed(author.posts.published()), request, make_rows)
+    )
     return render(request, 'posts/profile.html', context)
 
 
 def post_detail(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, pk=post_id)
-    comments = Comment.objects.filter(post=post)
+    identity_map = get_identity_map(request)
+    post = identity_map.get_or_404(Post, post_id)
+    if not post.is_published and post.author_id != request.user.pk:
+        raise Http404('Пост ещё не опубликован.')
+    comments = list(Comment.objects.filter(post_id=post.pk))
+    identity_map.load_related([post, *comments], 'author')
+    identity_map.load_related([post], 'group')
     context = {
         'post': post,
         'form': form,
@@ -66,16 +127,24 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@ratelimit('post_create')
 @login_required
 def post_create(request):
     form = PostForm(request.POST or None, files=request.FILES or None,)
+    publish_form = PublishForm(request.POST or None)
     if request.method == 'POST':
-        if form.is_valid():
+        reject_oversized_uploads(request, form)
+        if form.is_valid() and publish_form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
+            publish_form.apply(post)
             post.save()
             return redirect('posts:profile', post.author.username)
-    return render(request, 'posts/create_post.html', {'form': form})
+    return render(
+        request,
+        'posts/create_post.html',
+        {'form': form, 'publish_form': publish_form},
+    )
 
 
 @login_required(login_url='posts:post_detail')
@@ -87,23 +156,45 @@ def post_edit(request, post_id):
         files=request.FILES or None,
         instance=post,
     )
+    # Срок публикации можно менять, пока пост не вышел.
+    publish_form = None if post.is_published else PublishForm(
+        request.POST or None,
+        initial={
+            'mode': PublishForm.SCHEDULE if post.published_at
+            else PublishForm.DRAFT,
+            'published_at': post.published_at,
+        },
+    )
     if request.method == 'POST':
-        if form.is_valid():
-            post = form.save()
+        reject_oversized_uploads(request, form)
+        if form.is_valid() and (
+            publish_form is None or publish_form.is_valid()
+        ):
+            post = form.save(commit=False)
+            if publish_form is not None:
+                publish_form.apply(post)
+            post._editor = request.user
+            post.save()
             post.author = request.user
             post.pk = post_id
             return redirect('posts:post_detail', post_id)
     return render(
         request,
         'posts/create_post.html',
-        {'form': form, 'is_edit': is_edit, 'post_id': post_id},
+        {
+            'form': form,
+            'publish_form': publish_form,
+            'is_edit': is_edit,
+            'post_id': post_id,
+        },
     )
 
 
+@ratelimit('add_comment')
 @login_required
 def add_comment(request, post_id):
     form = CommentForm(request.POST or None)
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(Post.objects.published(), pk=post_id)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
@@ -114,20 +205,17 @@ def add_comment(request, post_id):
 
 @login_required
 def follow_index(request):
-    follower = Follow.objects.filter(user=request.user).values_list(
-        "author_id", flat=True
+    posts = Post.objects.published().filter(
+        author_id__in=list(get_following_ids(request.user.pk)),
     )
-    posts = Post.objects.filter(author_id__in=follower)
-    paginator = Paginator(posts, FIRST_TEN_VALUE)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
     context = {
-        "page_obj": page_obj,
         "title": "Избранные посты",
     }
+    context.update(get_page_context(feed(posts), request, make_rows))
     return render(request, "posts/follow.html", context)
 
 
+@ratelimit('profile_follow', methods=('GET', 'POST'))
 @login_required
 def profile_follow(request, username):
     author = get_object_or_404(User, username=username)
@@ -139,5 +227,5 @@ def profile_follow(request, username):
 @login_required
 def profile_unfollow(request, username):
     author = get_object_or_404(User, username=username)
-    get_object_or_404(Follow, author=author).delete()
+    get_object_or_404(Follow, user=request.user, author=author).delete()
     return redirect("posts:follow_index")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -31,25 +32,37 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.ProfilerMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.CachedAuthenticationMiddleware',
+    'core.middleware.IdentityMapMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'yatube.urls'
 
+TEST_RUNNER = 'core.test_runner.TestRunner'
+
 TEMPLATES_DIR = BASE_DIR.joinpath('templates')
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
+        'APP_DIRS': False,
         'OPTIONS': {
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -72,6 +85,8 @@ DATABASES = {
     },
 }
 
+SESSION_ENGINE = 'core.sessions'
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -97,6 +112,10 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
 FIRST_TEN_VALUE = 10  # Эта переменная используется пагинатором
 
 FIRST_FIFTEEN_VALUE = 15
@@ -119,8 +138,145 @@ MEDIA_URL = '/media/'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Адрес memcached (host:port), общего для всех воркеров. Без него кеш
+# живёт внутри процесса, и то, что должно быть видно всем воркерам
+# (отложенная запись сессий, пользователь из кеша), отключается.
+CACHE_LOCATION = os.environ.get('YATUBE_CACHE_LOCATION', '')
+
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache.InstrumentedMemcachedCache',
+        'LOCATION': CACHE_LOCATION,
+    } if CACHE_LOCATION else {
+        'BACKEND': 'core.cache.InstrumentedLocMemCache',
     }
 }
+
+GROUP_CACHE_TIMEOUT = 60 * 15  # Время жизни закешированной группы, секунд
+
+GROUP_TOP_AUTHORS = 3  # Сколько авторов показывать в каталоге групп
+
+FILE_UPLOAD_HANDLERS = ['posts.uploads.BoundedFileUploadHandler']
+
+IMAGE_UPLOAD_MAX_BYTES = 10 * 1024 * 1024  # Предельный размер загрузки
+
+IMAGE_MAX_PIXELS = 40_000_000  # Предельное число пикселей исходника
+
+IMAGE_MAX_SIDE = 2560  # Длинная сторона, до которой уменьшаются картинки
+
+IMAGE_FORMATS = ('JPEG', 'PNG', 'GIF', 'WEBP')
+
+# Ограничения частоты запросов: число запросов за окно (s, m, h, d)
+# и чем различать клиентов — пользователем ('user') или адресом ('ip').
+RATELIMITS = {
+    'add_comment': {'rate': '20/m', 'key': 'user'},
+    'post_create': {'rate': '10/m', 'key': 'user'},
+    'profile_follow': {'rate': '30/m', 'key': 'user'},
+}
+
+RATELIMIT_CACHE = 'default'  # Должен быть общим для воркеров (memcached)
+
+FOLLOW_CACHE_TIMEOUT = 60 * 60 * 24  # Время жизни кеша подписок, секунд
+
+SUGGESTIONS_PER_USER = 10  # Сколько рекомендаций подписок хранить
+
+SUGGESTIONS_ON_PAGE = 5  # Сколько рекомендаций показывать в профиле
+
+# Веса сигналов для рекомендаций подписок.
+SUGGESTION_WEIGHTS = {
+    'friends_of_friends': 1.0,
+    'co_follow': 2.0,
+    'co_comment': 0.5,
+}
+
+PAGINATOR_COUNT_TIMEOUT = 60 * 60  # Время жизни закешированного COUNT(*)
+
+PAGINATOR_ESTIMATE_THRESHOLD = 10_000  # Выше этого числа счёт оценивается
+
+PAGINATOR_ON_EACH_SIDE = 3  # Сколько номеров страниц показывать по бокам
+
+SNAPSHOT_ROOT = BASE_DIR.joinpath('snapshot')  # Статическая копия сайта
+
+FEED_ITEMS = 20  # Сколько постов отдавать в RSS/Atom
+
+FEED_CACHE_TIMEOUT = 60 * 60  # Время жизни закешированной ленты, секунд
+
+SITEMAP_ROOT = BASE_DIR.joinpath('sitemaps')  # Готовые файлы карты сайта
+
+SITEMAP_CHUNK_SIZE = 50_000  # Предел адресов в одном файле по протоколу
+
+SITEMAP_BASE_URL = 'https://nikitkosss.pythonanywhere.com'
+
+STATIC_COMPRESS_EXTENSIONS = ('.css', '.js', '.svg', '.html', '.txt', '.xml')
+
+STATIC_COMPRESS_MIN_SIZE = 256  # Мелкие файлы сжимать нет смысла, байт
+
+STATIC_MAX_AGE = 60 * 60 * 24 * 365  # Для файлов с хешем в имени, секунд
+
+COMPRESS_MIN_SIZE = 200  # Ответы короче не сжимаем, байт
+
+COMPRESS_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'application/rss+xml',
+    'application/atom+xml',
+)
+
+# Предел от запуска воркера до первого ответа, секунд; на медленных
+# машинах CI его можно поднять переменной окружения.
+STARTUP_BUDGET = float(os.environ.get('YATUBE_STARTUP_BUDGET', '3.0'))
+
+STARTUP_LAZY_MODULES = ('PIL', 'PIL.Image', 'sorl.thumbnail.engines')
+
+SESSION_WRITE_BEHIND = 5 * 60  # Как часто изменённая сессия пишется в базу
+
+USER_CACHE_TIMEOUT = 5 * 60  # Время жизни пользователя в кеше, секунд
+
+PUBLISH_BATCH_SIZE = 500  # Сколько отложенных постов публиковать за раз
+
+PUBLISH_INTERVAL = 30  # Как часто воркер проверяет очередь, секунд
+
+REVISION_SNAPSHOT_EVERY = 10  # Каждая какая версия поста хранится целиком
+
+REVISION_COMPACT_AFTER_DAYS = 90  # Старше — оставляем одну версию в день
+
+AUTOCOMPLETE_LIMIT = 10  # Сколько подсказок отдавать на один запрос
+
+# Версия индекса подсказок, общая для воркеров на этой машине
+AUTOCOMPLETE_VERSION_FILE = os.path.join(
+    tempfile.gettempdir(), 'yatube-autocomplete.version',
+)
+
+# Файлы счётчиков воркеров; файлы завершившихся процессов удаляются при
+# чтении /metrics или сразу через metrics.mark_process_dead в child_exit
+METRICS_DIR = os.environ.get(
+    'YATUBE_METRICS_DIR',
+    os.path.join(tempfile.gettempdir(), 'yatube-metrics'),
+)
+
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+
+METRICS_COLLECTORS = ['posts.publishing.queue_metrics']
+
+METRICS_ALLOWED_IPS = ('127.0.0.1', '::1')  # Адреса, которым /metrics открыт
+
+METRICS_TOKEN = ''  # Остальным нужен заголовок Authorization: Bearer <токен>
+
+PROFILE_VIEWS = ('posts:post_detail', 'posts:follow_index')
+
+PROFILE_THRESHOLD = 0.5  # Запрос дольше профилируется автоматически, секунд
+
+PROFILE_INTERVAL = 0.005  # Период снятия стеков, секунд
+
+PROFILE_SECRET = ''  # Значение X-Profile для профиля по требованию
+
+# Готовые профили; вне дерева исходников, как и файлы метрик
+PROFILE_DIR = os.path.join(tempfile.gettempdir(), 'yatube-profiles')
+
+PROFILE_KEEP = 100  # Сколько последних профилей хранить
+
+PROFILE_MAX_QUERIES = 1000  # Предел записанных SQL-запросов на профиль
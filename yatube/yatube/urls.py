@@ -1,7 +1,9 @@
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
-from django.urls import include, path
+from django.urls import include, path, re_path
+
+from core.views import metrics_view, serve_static
 
 
 urlpatterns = [
@@ -10,6 +12,11 @@ urlpatterns = [
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('metrics', metrics_view, name='metrics'),
+    re_path(
+        r'^{}(?P<path>.+)$'.format(settings.STATIC_URL.lstrip('/')),
+        serve_static,
+    ),
 ]
 
 handler404 = 'core.views.page_not_found'
@@ -17,9 +24,6 @@ handler404 = 'core.views.page_not_found'
 handler403 = 'core.views.csrf_failure'
 
 if settings.DEBUG:
-    urlpatterns += static(
-        settings.STATIC_URL, document_root=settings.STATIC_ROOT
-    )
     urlpatterns += static(
         settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
     )
@@ -5,3 +5,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Компилируем шаблоны до первого запроса, а не во время него.
+from core.warmup import warm_templates  # noqa: E402
+
+warm_templates()